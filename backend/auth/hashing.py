@@ -1,14 +1,89 @@
 # backend/auth/hashing.py
 
-from passlib.context import CryptContext
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Optional
 
-# bcrypt hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from backend import config
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from passlib.context import CryptContext
+
+
+# bcrypt hashing context, built on first use: passlib and its bcrypt backend
+# are only needed by signup/login (and in the hashing worker processes)
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
 
 # hash plain text password
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 # verify password during login
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+# ------------------------------
+# HASHING WORKER POOL
+# bcrypt is CPU bound, so it runs in separate processes (no GIL, uses all cores)
+# and never holds the threadpool that serves todo requests
+# ------------------------------
+_pool: Optional["ProcessPoolExecutor"] = None
+_pending = 0   # calls queued or running, only touched from the event loop
+
+
+def get_hash_pool() -> "ProcessPoolExecutor":
+    global _pool
+    if _pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        _pool = ProcessPoolExecutor(
+            max_workers=config.HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_hash_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def run_hashing(fn: Callable, *args):
+    # admission control: refuse new work instead of queueing without limit
+    global _pending
+    if _pending >= config.HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    try:
+        if config.HASH_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_pool(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+# async versions used by the auth routes
+async def hash_password_async(password: str) -> str:
+    return await run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_hashing(verify_password, plain_password, hashed_password)
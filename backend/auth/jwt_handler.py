@@ -1,15 +1,16 @@
 # backend/auth/jwt_handler.py
 
+import time
 from typing import Optional, Dict
 from datetime import datetime, timedelta
 
-from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
 
-from backend.models import User
-from backend.database import get_session
+from backend.models import Principal, User, UserRead
+from backend.database import get_session, run_db, session_scope
+from backend.auth.user_cache import TTLCache
 
 
 # ------------------------------
@@ -19,6 +20,18 @@ SECRET_KEY = "change_this_secret_for_production"   # change later
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 12
 
+# verified users are cached by username so requests skip the user SELECT
+USER_CACHE_MAX_SIZE = 10_000
+USER_CACHE_TTL_SECONDS = 300
+
+user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# current token_version per user id, tokens with an older "ver" are revoked
+# (other workers notice a revoke after at most this many seconds)
+TOKEN_VERSION_CACHE_TTL_SECONDS = 30
+
+token_versions = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=TOKEN_VERSION_CACHE_TTL_SECONDS)
+
 
 # ------------------------------
 # CUSTOM BEARER AUTH (no 'request' in Swagger)
@@ -41,16 +54,37 @@ class JWTBearer(HTTPBearer):
 oauth2_scheme = JWTBearer()
 
 
+# ------------------------------
+# JOSE (imported on the first token, python-jose and its rsa/ecdsa
+# backends add ~40 ms to every worker start otherwise)
+# ------------------------------
+def decode_token(token: str) -> Optional[Dict]:
+    # verified claims, None if the token is invalid or expired
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
 # ------------------------------
 # TOKEN CREATION
 # ------------------------------
 def create_access_token(data: Dict) -> str:
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     to_encode = data.copy()
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# claims for a user's token: username, user id and current token version
+def token_claims(user: User) -> Dict:
+    return {"sub": user.username, "uid": user.id, "ver": user.token_version}
+
+
 # ------------------------------
 # FETCH USER BY USERNAME
 # ------------------------------
@@ -59,29 +93,128 @@ def get_user_by_username(session: Session, username: str) -> Optional[User]:
     return session.exec(statement).first()
 
 
+def get_user_read_by_username(session: Session, username: str) -> Optional[UserRead]:
+    user = get_user_by_username(session, username)
+    return UserRead.model_validate(user) if user else None
+
+
 # ------------------------------
-# GET CURRENT USER FROM TOKEN
+# TOKEN VERSIONS (revocation)
 # ------------------------------
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
-) -> User:
-    credentials_exception = HTTPException(
+def get_token_version(session: Session, user_id: int) -> Optional[int]:
+    statement = select(User.token_version).where(User.id == user_id)
+    return session.exec(statement).first()
+
+
+# bump the user's token_version, every token issued so far stops working
+def revoke_user_tokens(session: Session, user_id: int) -> int:
+    statement = (
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    )
+    version = session.execute(statement).scalar_one()
+    session.commit()
+    return version
+
+
+async def current_token_version(session, user_id: int) -> Optional[int]:
+    version = token_versions.get(user_id)
+    if version is None:
+        version = await run_db(session, get_token_version, user_id)
+        if version is not None:
+            token_versions.set(user_id, version)
+    return version
+
+
+# ------------------------------
+# USER CACHE INVALIDATION (call after signup or user changes)
+# ------------------------------
+def invalidate_cached_user(username: str):
+    user_cache.invalidate(username)
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
 
-    user = get_user_by_username(session, username)
-    if user is None:
-        raise credentials_exception
+# lightweight UserRead, cached until the token expires
+async def get_cached_user(session, username: str, expires_at: Optional[float]) -> Optional[UserRead]:
+    cached_user = user_cache.get(username)
+    if cached_user is not None:
+        return cached_user
+
+    current_user = await run_db(session, get_user_read_by_username, username)
+    if current_user is not None:
+        # the cached entry must not outlive this token
+        user_cache.set(username, current_user, expires_in=expires_at - time.time() if expires_at else None)
+    return current_user
+
+
+# ------------------------------
+# GET CURRENT PRINCIPAL FROM TOKEN (todo routes)
+# id and username come straight from the verified claims, the only
+# lookup is the user's token_version (cached), so at most one query
+# ------------------------------
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session=Depends(get_session)
+) -> Principal:
+    return await principal_from_token(session, token)
+
 
-    return user
+async def principal_from_token(session, token: str) -> Principal:
+    payload = decode_token(token)
+    if payload is None:
+        raise credentials_exception()
+
+    username = payload.get("sub")
+    if username is None:
+        raise credentials_exception()
+    expires_at = payload.get("exp")
+    user_id = payload.get("uid")
+    version = payload.get("ver", 0)
+
+    if user_id is None:
+        # token issued before the uid/ver claims existed
+        user = await get_cached_user(session, username, expires_at)
+        if user is None:
+            raise credentials_exception()
+        user_id = user.id
+
+    if await current_token_version(session, user_id) != version:
+        raise credentials_exception()
+
+    return Principal(id=user_id, username=username, token_version=version, expires_at=expires_at)
+
+
+# ------------------------------
+# TOKEN SUBJECT outside of a route (profiling middleware)
+# username of a valid, unrevoked token, None otherwise
+# ------------------------------
+async def verified_subject(token: str) -> Optional[str]:
+    async with session_scope() as session:
+        try:
+            principal = await principal_from_token(session, token)
+        except HTTPException:
+            return None
+    return principal.username
+
+
+# ------------------------------
+# GET CURRENT USER FROM TOKEN
+# same checks as get_current_principal plus the cached UserRead
+# ------------------------------
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    session=Depends(get_session)
+) -> UserRead:
+    current_user = await get_cached_user(session, principal.username, principal.expires_at)
+    if current_user is None:
+        raise credentials_exception()
+    return current_user
@@ -4,10 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 
-from backend.models import UserCreate, Token, User
-from backend.database import get_session
-from backend.auth.hashing import hash_password, verify_password
-from backend.auth.jwt_handler import create_access_token, get_user_by_username
+from backend.models import UserCreate, Token, User, UserRead, Principal
+from backend.database import get_session, run_db
+from backend.ratelimit import rate_limit
+from backend.auth.hashing import hash_password_async, verify_password_async
+from backend.auth.jwt_handler import (
+    create_access_token, get_user_by_username, invalidate_cached_user,
+    token_claims, revoke_user_tokens, token_versions, get_current_principal,
+)
 
 from backend.auth.jwt_handler import get_current_user
 from backend.models import User
@@ -16,29 +20,37 @@ from backend.models import User
 # router for auth endpoints
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+
+# insert a new user row (runs through run_db)
+def create_user(session: Session, username: str, hashed_password: str) -> User:
+    new_user = User(username=username, hashed_password=hashed_password)
+    session.add(new_user)
+    session.commit()
+    session.refresh(new_user)
+    return new_user
+
+
 # ------------------------------
 # SIGNUP ROUTE(create new user)
 # ------------------------------
-@router.post("/signup", response_model=Token)
-def signup(user_in: UserCreate, session: Session = Depends(get_session)):
+@router.post("/signup", response_model=Token, dependencies=[Depends(rate_limit("signup", by="ip"))])
+async def signup(user_in: UserCreate, session=Depends(get_session)):
 
     # check if username already exists
-    existing_user = get_user_by_username(session, user_in.username)
+    existing_user = await run_db(session, get_user_by_username, user_in.username)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    # hash password
+    # hash password (runs in the hashing worker pool)
     password_str = str(user_in.password)[:72]   # ensure string + limit
-    hashed_password_value = hash_password(password_str)
+    hashed_password_value = await hash_password_async(password_str)
 
     # create new user
-    new_user = User(username=user_in.username, hashed_password=hashed_password_value)
-    session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    new_user = await run_db(session, create_user, user_in.username, hashed_password_value)
+    invalidate_cached_user(new_user.username)
 
     # create JWT token
-    token = create_access_token({"sub": new_user.username})
+    token = create_access_token(token_claims(new_user))
 
     return {"access_token": token, "token_type": "bearer"}
 
@@ -46,20 +58,20 @@ def signup(user_in: UserCreate, session: Session = Depends(get_session)):
 # ------------------------------
 # LOGIN ROUTE(generate token)
 # ------------------------------
-@router.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+@router.post("/token", response_model=Token, dependencies=[Depends(rate_limit("login", by="ip"))])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), session=Depends(get_session)):
 
     # find user
-    user = get_user_by_username(session, form_data.username)
+    user = await run_db(session, get_user_by_username, form_data.username)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     # verify password
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     # token
-    token = create_access_token({"sub": user.username})
+    token = create_access_token(token_claims(user))
 
     return {"access_token": token, "token_type": "bearer"}
 
@@ -67,9 +79,23 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
 # WHOAMI ROUTE (get current user info)
 # ----------------------------
 @router.get("/whoami")
-def who_am_i(current_user: User = Depends(get_current_user)):
+async def who_am_i(current_user: UserRead = Depends(get_current_user)):
     """Return info about the currently logged-in user."""
     return {
         "username": current_user.username,
         "created_at": current_user.created_at
     }
+
+
+# ------------------------------
+# REVOKE ROUTE (log out everywhere)
+# every token issued so far stops working, a fresh token is returned
+# ------------------------------
+@router.post("/revoke", response_model=Token)
+async def revoke_tokens(principal: Principal = Depends(get_current_principal), session=Depends(get_session)):
+    version = await run_db(session, revoke_user_tokens, principal.id)
+    token_versions.set(principal.id, version)
+    invalidate_cached_user(principal.username)
+
+    token = create_access_token({"sub": principal.username, "uid": principal.id, "ver": version})
+    return {"access_token": token, "token_type": "bearer"}
@@ -0,0 +1,56 @@
+# backend/auth/user_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# ------------------------------
+# BOUNDED TTL + LRU CACHE
+# used by get_current_user so authenticated requests skip the user SELECT
+# ------------------------------
+class TTLCache:
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()   # sync routes run in a threadpool
+
+    def get(self, key: Any) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)   # mark as recently used
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, expires_in: Optional[float] = None):
+        # an entry never lives longer than the cache ttl
+        ttl = self.ttl_seconds if expires_in is None else min(expires_in, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)   # evict least recently used
+
+    def invalidate(self, key: Any):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
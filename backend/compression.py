@@ -0,0 +1,205 @@
+# backend/compression.py
+
+# response compression middleware (plain ASGI)
+# - picks the best encoding the client accepts: br / zstd (when the optional
+#   brotli / zstandard packages are installed) or gzip
+# - bodies smaller than COMPRESSION_MIN_SIZE are sent as they are
+# - streaming responses (export) are compressed chunk by chunk and flushed,
+#   so they are never buffered in memory
+# - 204/304, HEAD, already encoded and non-text responses are left alone
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from backend import config
+
+try:
+    import brotli
+except ImportError:   # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:   # optional
+    zstandard = None
+
+
+# content types worth compressing
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+
+
+# ------------------------------
+# ENCODERS (compress() returns flushed output, so every chunk can be sent at once)
+# ------------------------------
+class GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(config.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=config.BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=config.ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+# ------------------------------
+# ACCEPT-ENCODING NEGOTIATION
+# ------------------------------
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    # highest q wins, ties go to the server's preference order
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for name in config.COMPRESSION_ENCODINGS:
+        if name not in ENCODERS:
+            continue
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(headers: MutableHeaders) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def add_vary(headers: MutableHeaders):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+# ------------------------------
+# MIDDLEWARE
+# ------------------------------
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        buffered: list[bytes] = []
+        buffered_size = 0
+        encoder = None
+        passthrough = False
+
+        async def send_start(compress: bool, content_length: Optional[int] = None):
+            headers = MutableHeaders(scope=start_message)
+            if compress:
+                headers["Content-Encoding"] = encoding
+                del headers["content-length"]
+                if content_length is not None:   # known when the whole body fit in one chunk
+                    headers["Content-Length"] = str(content_length)
+            await send(start_message)
+
+        async def send_compressed(message):
+            nonlocal start_message, buffered_size, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = MutableHeaders(scope=message)
+                if message["status"] < 200 or message["status"] in (204, 304) or not is_compressible(headers):
+                    passthrough = True
+                    await send(message)
+                else:
+                    add_vary(headers)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is not None:
+                # already streaming compressed output
+                data = encoder.compress(body) if body else b""
+                if not more_body:
+                    data += encoder.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            # hold the first chunks until the threshold is reached or the body ends
+            buffered.append(body)
+            buffered_size += len(body)
+            if more_body and buffered_size < config.COMPRESSION_MIN_SIZE:
+                return
+
+            data = b"".join(buffered)
+            buffered.clear()
+            if buffered_size < config.COMPRESSION_MIN_SIZE:
+                # whole body is small, not worth compressing
+                passthrough = True
+                await send_start(compress=False)
+                await send({"type": "http.response.body", "body": data, "more_body": False})
+                return
+
+            encoder = ENCODERS[encoding]()
+            data = encoder.compress(data)
+            if not more_body:
+                data += encoder.finish()
+            await send_start(compress=True, content_length=None if more_body else len(data))
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
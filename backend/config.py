@@ -0,0 +1,225 @@
+# backend/config.py
+
+import os
+
+
+# ---------------------------
+# ENV HELPERS
+# all settings can be overridden with TODO_* environment variables
+# ---------------------------
+def env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ---------------------------
+# DATABASE SETTINGS
+# ---------------------------
+
+# "sync" runs database work in the threadpool, "async" uses an aiosqlite engine
+DB_MODE = env_str("TODO_DB_MODE", "sync").lower()
+if DB_MODE not in ("sync", "async"):
+    raise ValueError(f"TODO_DB_MODE must be 'sync' or 'async', got {DB_MODE!r}")
+
+DB_ASYNC = DB_MODE == "async"
+
+# connection url, any SQLAlchemy url works (sqlite file by default)
+DATABASE_URL = env_str("TODO_DATABASE_URL", "sqlite:///database.db")
+
+# url for the async engine, derived from DATABASE_URL when not set
+ASYNC_DATABASE_URL = env_str("TODO_ASYNC_DATABASE_URL", "")
+
+# connection pool (ignored for in-memory sqlite)
+DB_POOL_SIZE = env_int("TODO_DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = env_int("TODO_DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = env_int("TODO_DB_POOL_TIMEOUT", 30)
+
+# log every SQL statement to stdout
+DB_ECHO = env_bool("TODO_DB_ECHO", False)
+
+# sqlite pragmas applied on every new connection
+# WAL lets readers and one writer work at the same time across workers
+SQLITE_JOURNAL_MODE = env_str("TODO_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = env_str("TODO_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = env_int("TODO_SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE = env_int("TODO_SQLITE_CACHE_SIZE", -64000)          # negative = KiB, so 64 MB
+SQLITE_MMAP_SIZE = env_int("TODO_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+
+
+# ---------------------------
+# PASSWORD HASHING SETTINGS
+# ---------------------------
+
+# bcrypt cost factor (each +1 doubles the hashing time)
+BCRYPT_ROUNDS = env_int("TODO_BCRYPT_ROUNDS", 12)
+
+# bcrypt runs in a process pool of this size, 0 = use the threadpool instead
+HASH_WORKERS = env_int("TODO_HASH_WORKERS", os.cpu_count() or 1)
+
+# max hash/verify calls queued or running before new ones get 503
+HASH_MAX_PENDING = env_int("TODO_HASH_MAX_PENDING", 64)
+
+
+# ---------------------------
+# EXPORT SETTINGS
+# ---------------------------
+
+# rows fetched from the database per chunk by /todos/export
+EXPORT_CHUNK_SIZE = env_int("TODO_EXPORT_CHUNK_SIZE", 1000)
+
+
+# ---------------------------
+# IMPORT SETTINGS
+# ---------------------------
+
+# rows inserted per transaction by /todos/import
+IMPORT_BATCH_SIZE = env_int("TODO_IMPORT_BATCH_SIZE", 1000)
+
+# max per-line errors listed in the import response (all are counted)
+IMPORT_MAX_ERRORS = env_int("TODO_IMPORT_MAX_ERRORS", 100)
+
+# longer import lines are rejected as a per-line error instead of buffered
+IMPORT_MAX_LINE_BYTES = env_int("TODO_IMPORT_MAX_LINE_BYTES", 64 * 1024)
+
+
+# ---------------------------
+# PROFILING SETTINGS
+# ---------------------------
+
+# allow admins to profile single requests with the "X-Profile: 1" header
+PROFILING_ENABLED = env_bool("TODO_PROFILING_ENABLED", False)
+
+# comma separated usernames allowed to request a profile
+ADMIN_USERS = frozenset(name.strip() for name in env_str("TODO_ADMIN_USERS", "").split(",") if name.strip())
+
+# where the .prof files are written
+PROFILE_DIR = env_str("TODO_PROFILE_DIR", "profiles")
+
+
+# ---------------------------
+# RESPONSE SETTINGS
+# ---------------------------
+
+# list/search build plain dicts and encode them with orjson instead of
+# validating TodoRead models through response_model
+FAST_JSON_RESPONSES = env_bool("TODO_FAST_JSON_RESPONSES", True)
+
+
+# ---------------------------
+# COMPRESSION SETTINGS
+# ---------------------------
+
+# compress responses for clients that send Accept-Encoding
+COMPRESSION_ENABLED = env_bool("TODO_COMPRESSION_ENABLED", True)
+
+# bodies smaller than this (bytes) are sent uncompressed
+COMPRESSION_MIN_SIZE = env_int("TODO_COMPRESSION_MIN_SIZE", 1024)
+
+# server preference when the client accepts several (br/zstd need the
+# optional brotli/zstandard packages, unavailable ones are skipped)
+COMPRESSION_ENCODINGS = [name.strip() for name in env_str("TODO_COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",") if name.strip()]
+
+# compression levels (lower = faster, higher = smaller)
+GZIP_LEVEL = env_int("TODO_GZIP_LEVEL", 6)
+BROTLI_QUALITY = env_int("TODO_BROTLI_QUALITY", 4)
+ZSTD_LEVEL = env_int("TODO_ZSTD_LEVEL", 3)
+
+
+# ---------------------------
+# RATE LIMIT SETTINGS
+# ---------------------------
+
+# token bucket limits per route group, "N/second|minute|hour|day", empty = no limit
+RATE_LIMIT_ENABLED = env_bool("TODO_RATE_LIMIT_ENABLED", True)
+RATE_LIMITS = {
+    "signup": env_str("TODO_RATE_LIMIT_SIGNUP", "5/minute"),     # per client IP
+    "login": env_str("TODO_RATE_LIMIT_LOGIN", "10/minute"),      # per client IP (bcrypt)
+    "list": env_str("TODO_RATE_LIMIT_LIST", "120/minute"),       # list/search/export/changes/stats, per user
+    "bulk": env_str("TODO_RATE_LIMIT_BULK", "30/minute"),        # bulk and import, per user
+    "todos": env_str("TODO_RATE_LIMIT_TODOS", "600/minute"),     # other todo routes, per user
+} if RATE_LIMIT_ENABLED else {}
+
+# "memory" = per worker process, "sqlite" = shared by all workers through a local file
+RATE_LIMIT_STORE = env_str("TODO_RATE_LIMIT_STORE", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = env_str("TODO_RATE_LIMIT_SQLITE_PATH", "ratelimit.db")
+
+# take the client IP from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_FORWARDED_FOR = env_bool("TODO_RATE_LIMIT_TRUST_FORWARDED_FOR", False)
+
+# proxies in front of the app that append to X-Forwarded-For, the client IP is
+# that many entries from the right (entries further left come from the client)
+RATE_LIMIT_TRUSTED_PROXIES = env_int("TODO_RATE_LIMIT_TRUSTED_PROXIES", 1)
+
+
+# ---------------------------
+# RESPONSE CACHE SETTINGS
+# ---------------------------
+
+# serialized GET /todos/ and /todos/{id} responses, dropped on every write
+# "memory" = per worker, "sqlite" = shared by all workers, "off" = disabled
+RESPONSE_CACHE_BACKEND = env_str("TODO_RESPONSE_CACHE_BACKEND", "memory").lower()
+
+# total size of cached bodies (bytes), least recently used entries go first
+RESPONSE_CACHE_MAX_BYTES = env_int("TODO_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+# upper bound on entry age, also how long another worker's memory cache may
+# serve a response after a write
+RESPONSE_CACHE_TTL_SECONDS = env_int("TODO_RESPONSE_CACHE_TTL_SECONDS", 30)
+
+RESPONSE_CACHE_SQLITE_PATH = env_str("TODO_RESPONSE_CACHE_SQLITE_PATH", "response_cache.db")
+
+
+# ---------------------------
+# SERVER SETTINGS (python -m backend.serve)
+# ---------------------------
+
+HOST = env_str("TODO_HOST", "127.0.0.1")
+PORT = env_int("TODO_PORT", 8003)
+
+# worker processes, 0 = one per CPU core
+WORKERS = env_int("TODO_WORKERS", 0)
+
+# seconds an idle keep-alive connection stays open (longer than a proxy's
+# idle timeout, so the proxy never reuses a connection the worker just closed)
+KEEP_ALIVE_SECONDS = env_int("TODO_KEEP_ALIVE_SECONDS", 15)
+
+# pending connections the listening socket queues while every worker is busy
+BACKLOG = env_int("TODO_BACKLOG", 2048)
+
+# requests or connections in flight per worker before it answers 503, 0 = no limit
+LIMIT_CONCURRENCY = env_int("TODO_LIMIT_CONCURRENCY", 1000)
+
+# restart a worker after this many requests (with jitter), 0 = never
+LIMIT_MAX_REQUESTS = env_int("TODO_LIMIT_MAX_REQUESTS", 0)
+
+# on SIGTERM, seconds in-flight requests get to finish before workers exit
+GRACEFUL_SHUTDOWN_SECONDS = env_int("TODO_GRACEFUL_SHUTDOWN_SECONDS", 30)
+
+ACCESS_LOG = env_bool("TODO_ACCESS_LOG", False)
+
+# create/migrate tables in every worker's startup hook; the launcher turns
+# this off for its workers because it runs the schema setup once before forking
+CREATE_TABLES_ON_STARTUP = env_bool("TODO_CREATE_TABLES_ON_STARTUP", True)
+
+
+# ---------------------------
+# API DOCS SETTINGS
+# ---------------------------
+
+# serve /docs, /redoc and /openapi.json (turn off in production to skip them)
+DOCS_ENABLED = env_bool("TODO_DOCS_ENABLED", True)
+
+# OpenAPI schema generated at build time (python -m backend.openapi), served
+# instead of building it from the routes on the first /openapi.json request
+OPENAPI_FILE = env_str("TODO_OPENAPI_FILE", "")
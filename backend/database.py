@@ -1,28 +1,199 @@
 # backend/database.py
 
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import event, inspect, literal, text
+from sqlalchemy.engine import Engine, Row, make_url
+from sqlalchemy.sql import Select
 from sqlmodel import SQLModel, create_engine, Session
 
+from backend import config
+from backend.profiling import profiled
+
 # ---------------------------
-# SQLITE DATABASE CONFIG
+# DATABASE CONFIG (see backend/config.py for the TODO_* env vars)
 # ---------------------------
 
-# sqlite database file name
-sqlite_file_name = "database.db"
+# async drivers used when TODO_ASYNC_DATABASE_URL is not given
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def make_async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend_name = parsed.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend_name!r}, set TODO_ASYNC_DATABASE_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend_name]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    options = {"echo": config.DB_ECHO}
+    parsed = make_url(url)
+    # in-memory sqlite uses a single shared connection, pool settings do not apply
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+# apply sqlite pragmas to every new connection
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def configure_engine(sync_engine: Engine):
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
 
-# sqlite connection url
-sqlite_url = f"sqlite:///{sqlite_file_name}"
 
 # engine connects python <-> to database
-engine = create_engine(sqlite_url, echo=True)   # echo=True shows queries in terminal
+engine = create_engine(config.DATABASE_URL, **engine_options(config.DATABASE_URL))
+configure_engine(engine)
+
+# async engine, only created when TODO_DB_MODE=async
+async_engine = None
+if config.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async_url = config.ASYNC_DATABASE_URL or make_async_url(config.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    configure_engine(async_engine.sync_engine)
 
 
 # create all database tables, this will create all tables present in models.py based on SQLModel
 def create_db_and_tables():
     SQLModel.metadata.create_all(bind=engine)
+    migrate_schema()
+    create_search_index()
+
+
+# bring tables created by an older version up to date:
+# add new columns (nullable, with their scalar default) and missing indexes
+def migrate_schema():
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                    ddl += f" DEFAULT {default}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# ---------------------------
+# FULL-TEXT SEARCH INDEX (sqlite FTS5)
+# todo_fts indexes todo.title/description, triggers keep it in sync with
+# every insert/update/delete, including the bulk and import paths
+# ---------------------------
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE todo_fts USING fts5(
+        title, description, content='todo', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS todo_fts_insert AFTER INSERT ON todo BEGIN
+        INSERT INTO todo_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todo_fts_delete AFTER DELETE ON todo BEGIN
+        INSERT INTO todo_fts(todo_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todo_fts_update AFTER UPDATE OF title, description ON todo BEGIN
+        INSERT INTO todo_fts(todo_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todo_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def create_search_index():
+    if engine.dialect.name != "sqlite":
+        return   # other databases use the LIKE fallback in search_todos
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'todo_fts'")).first()
+        if exists:
+            return
+        for ddl in SEARCH_INDEX_DDL:
+            conn.execute(text(ddl))
+        # index the todos that existed before the search index
+        conn.execute(text("INSERT INTO todo_fts(todo_fts) VALUES ('rebuild')"))
 
 
 # DB session dependency for FastAPI, Session gives us a connection to the DB
 # we wrap it in dependency so fastapi can inject it per request
-def get_session():
+def get_sync_session():
     with Session(engine) as session:
         yield session
+
+
+# same as above but yields an AsyncSession bound to the async engine
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+get_session = get_async_session if config.DB_ASYNC else get_sync_session
+
+
+# a session outside of FastAPI dependencies (middleware), usable with run_db
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[Any]:
+    if config.DB_ASYNC:
+        async with AsyncSession(async_engine) as session:
+            yield session
+    else:
+        with Session(engine) as session:
+            yield session
+
+
+# ---------------------------
+# RUN DATABASE WORK WITHOUT BLOCKING THE EVENT LOOP
+# fn is a plain function taking a sync Session as first argument:
+# - async mode: runs through AsyncSession.run_sync on the event loop
+# - sync mode: runs in the threadpool (profiled when the request is)
+# ---------------------------
+async def run_db(session: Any, fn: Callable, *args, **kwargs) -> Any:
+    if config.DB_ASYNC:
+        return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(profiled(fn), session, *args, **kwargs)
+
+
+# ---------------------------
+# STREAM ROWS IN CHUNKS (server-side cursor)
+# uses its own session because a streaming response outlives the
+# request's session dependency, memory stays at one chunk of rows
+# ---------------------------
+async def stream_rows(statement: Select, chunk_size: int) -> AsyncIterator[list[Row]]:
+    statement = statement.execution_options(yield_per=chunk_size)
+    if config.DB_ASYNC:
+        async with AsyncSession(async_engine) as session:
+            result = await session.stream(statement)
+            async for chunk in result.partitions():
+                yield chunk
+        return
+
+    def sync_chunks():
+        with Session(engine) as session:
+            yield from session.execute(statement).partitions()
+
+    async for chunk in iterate_in_threadpool(sync_chunks()):
+        yield chunk
@@ -0,0 +1,45 @@
+# backend/local_sqlite.py
+
+# a small sqlite file shared by all uvicorn workers on the machine, used by the
+# "sqlite" rate limit store and response cache backend
+# - one connection per thread, autocommit unless write() opens a transaction
+# - WAL, so readers never wait for the writer, and no fsync: the data is
+#   counters and cached responses, losing it on a crash is fine
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from backend import config
+
+
+class LocalSQLite:
+    def __init__(self, path: str, schema: Sequence[str]):
+        self.path = path
+        self.schema = schema   # CREATE ... IF NOT EXISTS statements, run per new connection
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            for ddl in self.schema:
+                conn.execute(ddl)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        # takes the write lock up front, so a read-modify-write is atomic
+        # across processes
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
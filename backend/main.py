@@ -1,58 +1,91 @@
 # backend/main.py
 
 from fastapi import FastAPI
-from backend.database import create_db_and_tables
+from fastapi.responses import PlainTextResponse
+from backend import config, metrics
+from backend.compression import CompressionMiddleware
+from backend.openapi import install_openapi
+from backend.profiling import ProfilingMiddleware
+from backend import ratelimit
+from backend.response_cache import response_cache
+from backend.database import create_db_and_tables, engine, async_engine
+from backend.auth import hashing
+from backend.auth.hashing import shutdown_hash_pool
+from backend.auth.jwt_handler import user_cache, verified_subject
 from backend.auth.routes import router as auth_router
 from backend.todo.routes import router as todo_router
 from fastapi import Depends
 from backend.auth.jwt_handler import get_current_user
-from backend.models import User
-
-# create FastAPI app
-app = FastAPI(title="Todo API with Auth")
-
-# --- Add JWT security scheme to OpenAPI manually ---
-from fastapi.openapi.utils import get_openapi
-
-def custom_openapi():
-    if app.openapi_schema:
-        return app.openapi_schema
-    openapi_schema = get_openapi(
-        title=app.title,
-        version="1.0.0",
-        description="Todo API with JWT Authentication",
-        routes=app.routes,
-    )
-    openapi_schema["components"]["securitySchemes"] = {
-        "JWTBearer": {
-            "type": "http",
-            "scheme": "bearer",
-            "bearerFormat": "JWT"
-        }
-    }
-    openapi_schema["security"] = [{"JWTBearer": []}]
-    app.openapi_schema = openapi_schema
-    return app.openapi_schema
+from backend.models import UserRead
+
+# create FastAPI app (docs can be turned off with TODO_DOCS_ENABLED=false)
+app = FastAPI(
+    title="Todo API with Auth",
+    docs_url="/docs" if config.DOCS_ENABLED else None,
+    redoc_url="/redoc" if config.DOCS_ENABLED else None,
+    openapi_url="/openapi.json" if config.DOCS_ENABLED else None,
+)
 
-app.openapi = custom_openapi
+# --- OpenAPI with the JWT security scheme, built on first use or read from TODO_OPENAPI_FILE ---
+install_openapi(app)
 
 
 # include routers
 app.include_router(auth_router)
 app.include_router(todo_router)
 
-# create tables on startup
+# --- Rate limiting: RateLimit-* headers for every limited route ---
+app.add_middleware(ratelimit.RateLimitHeadersMiddleware)
+
+# --- Compression: gzip (br/zstd if installed) above a size threshold, streams included ---
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# --- Metrics: per-route latency, queries per request, Server-Timing header ---
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine)
+
+metrics.register_gauge("todo_user_cache_hits_total", "get_current_user cache hits.", lambda: user_cache.hits, "counter")
+metrics.register_gauge("todo_user_cache_misses_total", "get_current_user cache misses.", lambda: user_cache.misses, "counter")
+metrics.register_gauge("todo_hash_pending", "Password hash/verify calls queued or running.", lambda: hashing._pending)
+metrics.register_gauge("todo_rate_limited_total", "Requests rejected with 429.", lambda: ratelimit.rejected, "counter")
+metrics.register_gauge("todo_response_cache_hits_total", "Todo responses served from the response cache.", lambda: response_cache.hits, "counter")
+metrics.register_gauge("todo_response_cache_misses_total", "Todo reads that missed the response cache.", lambda: response_cache.misses, "counter")
+metrics.register_gauge(
+    "todo_response_cache_hit_ratio", "Response cache hits / lookups.",
+    lambda: round(response_cache.hits / max(1, response_cache.hits + response_cache.misses), 4),
+)
+metrics.register_gauge("todo_response_cache_bytes", "Size of the cached response bodies.", lambda: response_cache.stats()["bytes"])
+
+# --- Profiling: admins can send "X-Profile: 1" to get a cProfile dump ---
+if config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, subject_of=verified_subject)
+
+# create tables on startup (python -m backend.serve does it once before starting workers)
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
+    if config.CREATE_TABLES_ON_STARTUP:
+        create_db_and_tables()
+
+# stop the password hashing workers
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_hash_pool()
 
 # home route
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to the Todo API!"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/whoami")
-def whoami(current_user: User = Depends(get_current_user)):
+async def whoami(current_user: UserRead = Depends(get_current_user)):
     return {
         "logged_in_as": current_user.username,
         "user_id": current_user.id
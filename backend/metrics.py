@@ -0,0 +1,201 @@
+# backend/metrics.py
+
+# request metrics for the FastAPI app
+# - MetricsMiddleware times every request and counts its SQL queries
+# - instrument_engine hooks SQLAlchemy so queries are attributed to the request
+# - render_metrics() returns everything in Prometheus text format (/metrics)
+# - every response gets a Server-Timing header (app time, db time, query count)
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+
+# ------------------------------
+# METRIC TYPES (small Prometheus-compatible subset, no extra dependency)
+# ------------------------------
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}   # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    le = format_labels(self.labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                inf = format_labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {count}")
+                lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    # value is read when /metrics is scraped
+    def __init__(self, name: str, help_text: str, read: Callable[[], float], metric_type: str = "gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.metric_type = metric_type
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {self.read()}",
+        ]
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_duration = Histogram(
+    "todo_http_request_duration_seconds", "Request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "todo_db_queries_per_request", "SQL statements executed per request.",
+    ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+request_db_time = Histogram(
+    "todo_db_time_per_request_seconds", "Time spent in SQL per request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+
+metrics: list = [request_duration, request_queries, request_db_time]
+
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float], metric_type: str = "gauge"):
+    metrics.append(Gauge(name, help_text, read, metric_type))
+
+
+# threadpool used by sync dependencies and run_db in sync mode
+# (read from the event loop thread when /metrics is scraped)
+def threadpool_limiter():
+    return anyio.to_thread.current_default_thread_limiter()
+
+
+register_gauge("todo_threadpool_size", "Threadpool capacity.", lambda: threadpool_limiter().total_tokens)
+register_gauge("todo_threadpool_busy", "Threadpool workers in use.", lambda: threadpool_limiter().borrowed_tokens)
+register_gauge(
+    "todo_threadpool_queue_depth", "Tasks waiting for a threadpool worker.",
+    lambda: threadpool_limiter().statistics().tasks_waiting,
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------
+# PER-REQUEST QUERY ACCOUNTING
+# the stats object lives in a contextvar, so it follows the request into
+# the threadpool (sync mode) and into run_sync greenlets (async mode)
+# ------------------------------
+class RequestStats:
+    __slots__ = ("query_count", "query_time")
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_time += time.perf_counter() - started
+
+
+def instrument_engine(sync_engine: Engine):
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+# ------------------------------
+# MIDDLEWARE (plain ASGI so streaming responses are not buffered)
+# ------------------------------
+def route_label(scope) -> str:
+    # use the route template, not the raw path, to keep label cardinality low
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'app;dur={app_ms:.1f}, db;dur={stats.query_time * 1000:.1f};desc="{stats.query_count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            route = route_label(scope)
+            method = scope["method"]
+            request_duration.observe((method, route, str(status_code)), time.perf_counter() - started)
+            request_queries.observe((method, route), stats.query_count)
+            request_db_time.observe((method, route), stats.query_time)
@@ -1,7 +1,8 @@
 # backend/models.py
 
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -13,18 +14,44 @@ class User(SQLModel, table=True):
     username: str = Field(index=True, nullable=False)                # username of user
     hashed_password: str                                             # store hashed password
     created_at: datetime = Field(default_factory=datetime.utcnow)    # signup time
+    todo_version: int = Field(default=0)                             # bumped on every todo write (collection ETag)
+    token_version: int = Field(default=0)                            # bumped to revoke every issued token
 
 
 # -------------------------
 # TODO MODEL (DB TABLE)
 # -------------------------
 class Todo(SQLModel, table=True):
+    # composite indexes used by keyset pagination in list_todos and by /todos/changes
+    __table_args__ = (
+        Index("ix_todo_owner_created_id", "owner_id", "created_at", "id"),
+        Index("ix_todo_owner_version", "owner_id", "version"),
+        Index("ix_todo_owner_completed_at", "owner_id", "completed_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)         # auto id
     title: str                                                        # todo title
     description: Optional[str] = None                                 # description optional
     completed: bool = Field(default=False)                            # default not done
     created_at: datetime = Field(default_factory=datetime.utcnow)     # created time
+    updated_at: datetime = Field(default_factory=datetime.utcnow)     # last change time
+    completed_at: Optional[datetime] = None                           # set when marked completed
     owner_id: int = Field(foreign_key="user.id")                      # connected to user table
+    version: int = Field(default=0)                                   # owner's todo_version at last write (ETag)
+
+
+# -------------------------
+# TODO TOMBSTONE (DB TABLE)
+# one row per deleted todo so /todos/changes can report deletes
+# -------------------------
+class TodoTombstone(SQLModel, table=True):
+    __table_args__ = (Index("ix_todotombstone_owner_version", "owner_id", "version"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    todo_id: int                                                      # id of the deleted todo
+    owner_id: int = Field(foreign_key="user.id")
+    version: int                                                      # owner's todo_version at delete time
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 # -------------------------
@@ -50,12 +77,90 @@ class TodoRead(SQLModel):
     description: Optional[str] = None
     completed: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None     # empty for rows created before this column existed
+    completed_at: Optional[datetime] = None
     owner_id: int
+    version: int = 0
 
     class Config:
         from_attributes = True    # important for SQLModel -> JSON
 
 
+# -------------------------
+# SYNC SCHEMAS (GET /todos/changes)
+# -------------------------
+
+# a deleted todo
+class TodoDeleted(SQLModel):
+    id: int
+    version: int
+    deleted_at: datetime
+
+# everything that changed after a cursor, pass cursor as ?since= next time
+# (once has_more is false); while has_more, fetch the rest with ?after=next
+class TodoChanges(SQLModel):
+    cursor: int
+    changed: list[TodoRead]
+    deleted: list[TodoDeleted]
+    has_more: bool = False
+    next: Optional[str] = None
+
+
+# -------------------------
+# STATS SCHEMAS (GET /todos/stats)
+# -------------------------
+
+# number of todos for one day
+class DayCount(SQLModel):
+    day: date
+    count: int
+
+# totals + per-day histograms for the last `days` days
+class TodoStats(SQLModel):
+    total: int
+    completed: int
+    open: int
+    days: int
+    created_per_day: list[DayCount]
+    completed_per_day: list[DayCount]
+
+
+# -------------------------
+# BULK SCHEMAS (POST / PATCH / DELETE /todos/bulk)
+# -------------------------
+
+# one item of a bulk update (id + fields to change)
+class TodoBulkUpdate(TodoUpdate):
+    id: int
+
+# input for bulk delete
+class TodoBulkDelete(SQLModel):
+    ids: list[int]
+
+# per-item result of a bulk operation
+class BulkItemResult(SQLModel):
+    index: int                        # position in the request
+    id: Optional[int] = None
+    status: str                       # created / updated / deleted / not_found
+    todo: Optional[TodoRead] = None
+
+
+# -------------------------
+# IMPORT SCHEMAS (POST /todos/import)
+# -------------------------
+
+# a line of the import that could not be used
+class ImportLineError(SQLModel):
+    line: int
+    error: str
+
+# import summary
+class TodoImportResult(SQLModel):
+    imported: int
+    failed: int
+    errors: list[ImportLineError]
+
+
 # -------------------------
 # AUTH related SCHEMAS
 # -------------------------
@@ -71,6 +176,13 @@ class UserRead(SQLModel):
     class Config:
         from_attributes = True
 
+# authenticated caller, built from the verified token claims (no user row needed)
+class Principal(SQLModel):
+    id: int
+    username: str
+    token_version: int = 0
+    expires_at: Optional[float] = None    # token exp claim (unix time)
+
 # token response
 class Token(SQLModel):
     access_token: str
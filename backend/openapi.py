@@ -0,0 +1,79 @@
+# backend/openapi.py
+
+# OpenAPI schema for /openapi.json and /docs
+# - built from the routes on the first request (get_openapi walks every
+#   route and model, ~100 ms), then kept on the app
+# - TODO_OPENAPI_FILE serves a schema generated at build time instead:
+#     python -m backend.openapi --output openapi.json
+# - TODO_DOCS_ENABLED=false removes /docs, /redoc and /openapi.json
+
+import argparse
+import json
+import logging
+import os
+
+from fastapi import FastAPI
+from fastapi.openapi.utils import get_openapi
+
+from backend import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# ------------------------------
+# BUILD (adds the JWT security scheme)
+# ------------------------------
+def build_openapi(app: FastAPI) -> dict:
+    openapi_schema = get_openapi(
+        title=app.title,
+        version="1.0.0",
+        description="Todo API with JWT Authentication",
+        routes=app.routes,
+    )
+    openapi_schema["components"]["securitySchemes"] = {
+        "JWTBearer": {
+            "type": "http",
+            "scheme": "bearer",
+            "bearerFormat": "JWT"
+        }
+    }
+    openapi_schema["security"] = [{"JWTBearer": []}]
+    return openapi_schema
+
+
+# ------------------------------
+# INSTALL ON THE APP (app.openapi is called for every /openapi.json request)
+# ------------------------------
+def install_openapi(app: FastAPI):
+    def custom_openapi():
+        if app.openapi_schema:
+            return app.openapi_schema
+        if config.OPENAPI_FILE and os.path.exists(config.OPENAPI_FILE):
+            with open(config.OPENAPI_FILE, encoding="utf-8") as file:
+                app.openapi_schema = json.load(file)
+        else:
+            if config.OPENAPI_FILE:
+                logger.warning("TODO_OPENAPI_FILE %s does not exist, building the schema", config.OPENAPI_FILE)
+            app.openapi_schema = build_openapi(app)
+        return app.openapi_schema
+
+    app.openapi = custom_openapi
+
+
+# ------------------------------
+# BUILD STEP: write the schema to a file
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema of the Todo API")
+    parser.add_argument("--output", default=config.OPENAPI_FILE or "openapi.json")
+    args = parser.parse_args()
+
+    from backend.main import app
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(build_openapi(app), file, separators=(",", ":"))
+    print(f"OpenAPI schema written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# backend/profiling.py
+
+# opt-in request profiling (TODO_PROFILING_ENABLED=true)
+# - an admin sends "X-Profile: 1" and the request runs under cProfile
+# - the event loop thread is profiled by the middleware (JWT decoding,
+#   handler code, TodoRead validation/serialization, async-mode SQL)
+# - run_db work in the threadpool (sync-mode SQL) gets its own profiler
+#   through profiled(), all of them are merged into one .prof file
+#   (python 3.12+ allows one profiler per process, and that one already sees
+#   every thread, so there are no worker profilers there)
+# - one request is profiled at a time per process, a second "X-Profile: 1"
+#   request gets 409 while one is running
+# - the file path is returned in the X-Profile-File response header
+#
+# open the dump with pstats, snakeviz or flameprof (for a flamegraph):
+#   python -m pstats profiles/<file>.prof
+#   snakeviz profiles/<file>.prof
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Awaitable, Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from backend import config
+
+PROFILE_HEADER = "x-profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+# 3.12+ cProfile uses sys.monitoring: one active profiler per process, all threads
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+# held while a request is profiled
+profiling_lock = threading.Lock()
+
+
+# ------------------------------
+# PER-REQUEST PROFILE (followed into threadpool workers by the contextvar)
+# ------------------------------
+class RequestProfile:
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.workers: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add_worker(self, profiler: cProfile.Profile):
+        with self._lock:
+            self.workers.append(profiler)
+
+    def dump(self, path: str):
+        stats = pstats.Stats(self.main)
+        for profiler in self.workers:
+            stats.add(profiler)
+        stats.dump_stats(path)
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def profiled(fn: Callable) -> Callable:
+    # wrap a function that runs in a worker thread, cProfile only sees its own thread
+    profile = current_profile.get()
+    if profile is None or PROFILER_SEES_ALL_THREADS:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profile.add_worker(profiler)
+
+    return wrapper
+
+
+# ------------------------------
+# MIDDLEWARE (only added when profiling is enabled)
+# ------------------------------
+def profile_path(scope) -> str:
+    name = scope["path"].strip("/").replace("/", "_") or "root"
+    return os.path.join(config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{name}-{time.monotonic_ns()}.prof")
+
+
+class ProfilingMiddleware:
+    # subject_of maps a bearer token to its username (None if invalid or revoked)
+    def __init__(self, app, subject_of: Callable[[str], Awaitable[Optional[str]]]):
+        self.app = app
+        self.subject_of = subject_of
+
+    async def wants_profile(self, scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER, "").lower() not in ("1", "true", "yes"):
+            return False
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        return await self.subject_of(token) in config.ADMIN_USERS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not profiling_lock.acquire(blocking=False):
+            await self.busy(scope, receive, send)
+            return
+        try:
+            await self.profile_request(scope, receive, send)
+        finally:
+            profiling_lock.release()
+
+    async def busy(self, scope, receive, send):
+        response = JSONResponse({"detail": "Another request is being profiled, retry later"}, status_code=409)
+        await response(scope, receive, send)
+
+    async def profile_request(self, scope, receive, send):
+        path = profile_path(scope)
+        profile = RequestProfile()
+
+        # note: other requests running on the event loop at the same time
+        # (and on 3.12+ in any thread) also show up in the main profile
+        try:
+            profile.main.enable()
+        except ValueError:   # 3.12+: another profiling tool (debugger, coverage) is active
+            await self.busy(scope, receive, send)
+            return
+
+        async def send_with_path(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_FILE_HEADER, path)
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            profile.main.disable()
+            current_profile.reset(token)
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            profile.dump(path)
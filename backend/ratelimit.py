@@ -0,0 +1,204 @@
+# backend/ratelimit.py
+
+# token bucket rate limiting
+# - each limited route names a bucket ("login", "list", ...) with a limit from
+#   config (e.g. "10/minute" = bucket of 10, refilled at 10 per minute)
+# - buckets are keyed by user id (authenticated routes) or client IP (login/signup)
+# - the store is pluggable: "memory" (per process) or "sqlite" (a local file
+#   shared by all uvicorn workers on the machine)
+# - responses get RateLimit-Limit/-Remaining/-Reset headers, 429s also Retry-After
+#
+# a store only needs take(key, capacity, rate, now) -> (allowed, tokens left),
+# so a Redis-backed one can be added the same way
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from backend import config
+from backend.auth.jwt_handler import get_current_principal
+from backend.local_sqlite import LocalSQLite
+from backend.models import Principal
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Limit(NamedTuple):
+    capacity: int     # burst size
+    rate: float       # tokens added per second
+
+
+def parse_limit(value: str) -> Optional[Limit]:
+    # "10/minute" -> Limit(10, 10 / 60), empty disables the limit
+    if not value:
+        return None
+    count, _, period = value.partition("/")
+    if period not in PERIODS or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '10/minute'")
+    return Limit(int(count), int(count) / PERIODS[period])
+
+
+LIMITS = {name: parse_limit(value) for name, value in config.RATE_LIMITS.items()}
+
+
+# ------------------------------
+# STORES
+# ------------------------------
+def refill(tokens: float, updated_at: float, now: float, limit: Limit) -> float:
+    return min(limit.capacity, tokens + max(0.0, now - updated_at) * limit.rate)
+
+
+class MemoryStore:
+    blocking = False   # fast enough to run on the event loop
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, now: float) -> tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.capacity, now))
+            tokens = refill(tokens, updated_at, now, limit)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # evicting the least recently used bucket only forgets an old,
+            # mostly refilled bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+
+class SQLiteStore:
+    blocking = True   # runs in the threadpool
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS rate_limit_bucket ("
+        "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)",
+    ]
+
+    def __init__(self, path: str):
+        self.db = LocalSQLite(path, self.SCHEMA)
+
+    def take(self, key: str, limit: Limit, now: float) -> tuple[bool, float]:
+        with self.db.write() as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limit_bucket WHERE key = ?", (key,)).fetchone()
+            tokens = refill(row[0], row[1], now, limit) if row else limit.capacity
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO rate_limit_bucket (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now),
+            )
+        return allowed, tokens
+
+
+def make_store():
+    if config.RATE_LIMIT_STORE == "memory":
+        return MemoryStore()
+    if config.RATE_LIMIT_STORE == "sqlite":
+        return SQLiteStore(config.RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"TODO_RATE_LIMIT_STORE must be 'memory' or 'sqlite', got {config.RATE_LIMIT_STORE!r}")
+
+
+store = make_store()
+rejected = 0   # requests answered with 429 (exported on /metrics)
+
+
+# ------------------------------
+# CHECK + HEADERS
+# ------------------------------
+def limit_headers(limit: Limit, tokens: float) -> dict:
+    return {
+        "RateLimit-Limit": str(limit.capacity),
+        "RateLimit-Remaining": str(int(tokens)),
+        "RateLimit-Reset": str(math.ceil((limit.capacity - tokens) / limit.rate)),   # seconds until full
+    }
+
+
+async def check_limit(request: Request, name: str, key: str):
+    global rejected
+    limit = LIMITS.get(name)
+    if limit is None:
+        return
+
+    bucket_key = f"{name}:{key}"
+    now = time.time()   # wall clock, shared with other processes
+    if store.blocking:
+        allowed, tokens = await run_in_threadpool(store.take, bucket_key, limit, now)
+    else:
+        allowed, tokens = store.take(bucket_key, limit, now)
+
+    headers = limit_headers(limit, tokens)
+    if not allowed:
+        rejected += 1
+        headers["Retry-After"] = str(math.ceil((1 - tokens) / limit.rate))
+        raise HTTPException(status_code=429, detail="Too many requests", headers=headers)
+
+    # added to the response by RateLimitHeadersMiddleware, which also covers
+    # handlers that return a Response object directly
+    request.state.rate_limit_headers = headers
+
+
+def client_ip(request: Request) -> str:
+    # every trusted proxy appends the address it got the request from, so the
+    # Nth entry from the right is the client and anything left of it is the
+    # client's own (forgeable) header
+    if config.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = [address.strip() for address in request.headers.get("x-forwarded-for", "").split(",")]
+        hops = config.RATE_LIMIT_TRUSTED_PROXIES
+        if hops > 0 and len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+# ------------------------------
+# DEPENDENCIES (use as dependencies=[Depends(rate_limit("list"))])
+# ------------------------------
+def rate_limit(name: str, by: str = "user"):
+    if by == "user":
+        async def limit_by_user(request: Request, principal: Principal = Depends(get_current_principal)):
+            await check_limit(request, name, f"user:{principal.id}")
+        return limit_by_user
+
+    async def limit_by_ip(request: Request):
+        await check_limit(request, name, f"ip:{client_ip(request)}")
+    return limit_by_ip
+
+
+# ------------------------------
+# MIDDLEWARE (copies the headers stored by check_limit onto the response)
+# ------------------------------
+class RateLimitHeadersMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = state.get("rate_limit_headers")
+                if headers:
+                    response_headers = MutableHeaders(scope=message)
+                    for name, value in headers.items():
+                        if name not in response_headers:
+                            response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
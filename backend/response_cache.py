@@ -0,0 +1,226 @@
+# backend/response_cache.py
+
+# read-through cache for serialized todo responses
+# - entries are per user: "todo:<id>" (GET /todos/{id}) and "list:<query>" (GET /todos/)
+# - every write bumps the user's generation, which drops all their list
+#   entries, and deletes the entries of the todos it changed
+# - a response read before a write finished is never stored (its generation
+#   is older than the current one), so a write can not be undone by a slow read
+# - backends: "memory" (LRU bounded by body bytes, per worker), "sqlite" (a local
+#   file shared by all workers, so invalidation is exact across processes),
+#   "off" disables caching
+# - with several workers and the memory backend, entries written by other
+#   workers are only noticed after TODO_RESPONSE_CACHE_TTL_SECONDS
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from backend import config
+from backend.local_sqlite import LocalSQLite
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict
+
+
+# ------------------------------
+# MEMORY BACKEND (LRU bounded by total body size)
+# ------------------------------
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size = 0
+        # (user_id, key) -> (expires_at, generation, scoped, CachedResponse)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, full_key: tuple):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self.size -= len(entry[3].body)
+
+    def get(self, user_id: int, key: str) -> tuple[Optional[CachedResponse], int]:
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get(user_id, 0)
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None, generation
+            expires_at, entry_generation, scoped, response = entry
+            if expires_at <= now or (scoped and entry_generation != generation):
+                self._drop((user_id, key))
+                return None, generation
+            self._entries.move_to_end((user_id, key))
+            return response, generation
+
+    def set(self, user_id: int, key: str, response: CachedResponse, generation: int, scoped: bool):
+        size = len(response.body)
+        if size > self.max_bytes // 16:
+            return   # one huge page would push out everything else
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return   # a write happened while this response was built
+            self._drop((user_id, key))
+            self._entries[(user_id, key)] = (time.monotonic() + self.ttl_seconds, generation, scoped, response)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate(self, user_id: int, keys: Iterable[str]):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for key in keys:
+                self._drop((user_id, key))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size}
+
+
+# ------------------------------
+# SQLITE BACKEND (shared by every worker on the machine)
+# evicts the oldest stored entries once the total size is over the limit
+# ------------------------------
+class SQLiteBackend:
+    blocking = True
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS cache_entry ("
+        "user_id INTEGER NOT NULL, key TEXT NOT NULL, generation INTEGER NOT NULL, scoped INTEGER NOT NULL, "
+        "expires_at REAL NOT NULL, stored_at REAL NOT NULL, body BLOB NOT NULL, headers TEXT NOT NULL, "
+        "PRIMARY KEY (user_id, key))",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entry_stored_at ON cache_entry (stored_at)",
+        "CREATE TABLE IF NOT EXISTS cache_generation (user_id INTEGER PRIMARY KEY, generation INTEGER NOT NULL)",
+    ]
+    EVICT_CHECK_EVERY = 100   # sets between size checks
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.db = LocalSQLite(path, self.SCHEMA)
+        self._sets = 0
+
+    @staticmethod
+    def generation(conn: sqlite3.Connection, user_id: int) -> int:
+        row = conn.execute("SELECT generation FROM cache_generation WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get(self, user_id: int, key: str) -> tuple[Optional[CachedResponse], int]:
+        conn = self.db.connection()
+        row = conn.execute(
+            "SELECT e.generation, e.scoped, e.expires_at, e.body, e.headers, COALESCE(g.generation, 0) "
+            "FROM cache_entry e LEFT JOIN cache_generation g ON g.user_id = e.user_id "
+            "WHERE e.user_id = ? AND e.key = ?",
+            (user_id, key),
+        ).fetchone()
+        if row is None:
+            return None, self.generation(conn, user_id)
+        entry_generation, scoped, expires_at, body, headers, generation = row
+        if expires_at <= time.time() or (scoped and entry_generation != generation):
+            return None, generation
+        return CachedResponse(body, json.loads(headers)), generation
+
+    def set(self, user_id: int, key: str, response: CachedResponse, generation: int, scoped: bool):
+        if len(response.body) > self.max_bytes // 16:
+            return
+        conn = self.db.connection()
+        now = time.time()
+        # only stored if the generation did not move since the read started
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entry "
+            "SELECT ?, ?, ?, ?, ?, ?, ?, ? WHERE COALESCE((SELECT generation FROM cache_generation WHERE user_id = ?), 0) = ?",
+            (user_id, key, generation, int(scoped), now + self.ttl_seconds, now,
+             response.body, json.dumps(response.headers), user_id, generation),
+        )
+        self._sets += 1
+        if self._sets % self.EVICT_CHECK_EVERY == 0:
+            self.evict(conn)
+
+    def evict(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM cache_entry").fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT user_id, key, LENGTH(body) FROM cache_entry ORDER BY stored_at LIMIT 100").fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM cache_entry WHERE user_id = ? AND key = ?", [row[:2] for row in rows])
+            total -= sum(row[2] for row in rows)
+
+    def invalidate(self, user_id: int, keys: Iterable[str]):
+        with self.db.write() as conn:
+            conn.execute(
+                "INSERT INTO cache_generation (user_id, generation) VALUES (?, 1) "
+                "ON CONFLICT(user_id) DO UPDATE SET generation = generation + 1",
+                (user_id,),
+            )
+            conn.executemany("DELETE FROM cache_entry WHERE user_id = ? AND key = ?", [(user_id, key) for key in keys])
+
+    def stats(self) -> dict:
+        row = self.db.connection().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM cache_entry").fetchone()
+        return {"entries": row[0], "bytes": row[1]}
+
+
+# ------------------------------
+# CACHE FRONT (what the routes use)
+# ------------------------------
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.enabled = backend is not None
+        self.hits = 0
+        self.misses = 0
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def get(self, user_id: int, key: str) -> tuple[Optional[CachedResponse], int]:
+        # returns the cached response (or None) and the generation to store under
+        if not self.enabled:
+            return None, 0
+        response, generation = await self._call(self.backend.get, user_id, key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response, generation
+
+    async def set(self, user_id: int, key: str, body: bytes, headers: dict, generation: int, scoped: bool):
+        # scoped entries (lists) are dropped by any write of the user
+        if self.enabled:
+            await self._call(self.backend.set, user_id, key, CachedResponse(body, headers), generation, scoped)
+
+    async def invalidate(self, user_id: int, todo_ids: Iterable[int] = ()):
+        # call after every committed write: drops all lists and the given todos
+        if self.enabled:
+            await self._call(self.backend.invalidate, user_id, [f"todo:{todo_id}" for todo_id in todo_ids])
+
+    def stats(self) -> dict:
+        return self.backend.stats() if self.enabled else {"entries": 0, "bytes": 0}
+
+
+def make_backend():
+    backend = config.RESPONSE_CACHE_BACKEND
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return MemoryBackend(config.RESPONSE_CACHE_MAX_BYTES, config.RESPONSE_CACHE_TTL_SECONDS)
+    if backend == "sqlite":
+        return SQLiteBackend(config.RESPONSE_CACHE_SQLITE_PATH, config.RESPONSE_CACHE_MAX_BYTES, config.RESPONSE_CACHE_TTL_SECONDS)
+    raise ValueError(f"TODO_RESPONSE_CACHE_BACKEND must be 'memory', 'sqlite' or 'off', got {backend!r}")
+
+
+response_cache = ResponseCache(make_backend())
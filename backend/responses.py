@@ -0,0 +1,34 @@
+# backend/responses.py
+
+# fast JSON responses for the hot list endpoints
+# - routes return FastJSONResponse directly with plain dicts that already
+#   have the output shape, so FastAPI skips response_model validation/encoding
+# - encoded with orjson when it is installed, stdlib json otherwise
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:   # optional, only makes encoding faster
+    orjson = None
+
+
+def json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
@@ -0,0 +1,114 @@
+# backend/serve.py
+
+# production launcher
+#   python -m backend.serve [--workers N] [--host 0.0.0.0] [--port 8003]
+# - creates/migrates the schema once, then starts the uvicorn workers (one
+#   per CPU core by default), which skip the table creation in their startup hook
+# - with several workers, the rate limit buckets and the response cache default
+#   to the shared sqlite stores and each worker's bcrypt pool to its share of
+#   the CPU cores (explicit TODO_* settings are kept)
+# - uses uvloop and httptools when installed (pip install "uvicorn[standard]"),
+#   otherwise asyncio and h11
+# - keep-alive, listen backlog and per-worker concurrency limit come from config
+# - SIGTERM/SIGINT: workers stop accepting connections, let in-flight requests
+#   finish (at most TODO_GRACEFUL_SHUTDOWN_SECONDS), run the shutdown hooks and exit
+
+import argparse
+import importlib.util
+import logging
+import os
+
+from backend import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def worker_count(requested: int) -> int:
+    return requested if requested > 0 else os.cpu_count() or 1
+
+
+# ------------------------------
+# SCHEMA SETUP (once, before any worker starts)
+# ------------------------------
+def prepare_database(workers: int):
+    import backend.models  # noqa: F401  (registers the tables on SQLModel.metadata)
+    from backend.database import create_db_and_tables, engine
+
+    create_db_and_tables()
+    engine.dispose()   # the workers open their own connections
+
+    # workers are fresh interpreters that read the environment
+    os.environ["TODO_CREATE_TABLES_ON_STARTUP"] = "false"
+    config.CREATE_TABLES_ON_STARTUP = False   # for --workers 1, which runs in this process
+
+    # the memory stores live in each worker, share them unless set explicitly
+    if workers > 1:
+        os.environ.setdefault("TODO_RATE_LIMIT_STORE", "sqlite")
+        os.environ.setdefault("TODO_RESPONSE_CACHE_BACKEND", "sqlite")
+        config.RATE_LIMIT_STORE = os.environ["TODO_RATE_LIMIT_STORE"].lower()
+        config.RESPONSE_CACHE_BACKEND = os.environ["TODO_RESPONSE_CACHE_BACKEND"].lower()
+
+        # every worker has its own bcrypt pool, split the cores between them
+        # instead of starting cores x cores hashing processes
+        os.environ.setdefault("TODO_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+        config.HASH_WORKERS = int(os.environ["TODO_HASH_WORKERS"])
+
+
+def warn_per_worker_state(workers: int):
+    # explicitly set to memory: limits and invalidation are not shared
+    if workers < 2:
+        return
+    if config.RATE_LIMIT_ENABLED and config.RATE_LIMIT_STORE == "memory":
+        logger.warning("TODO_RATE_LIMIT_STORE=memory: every worker has its own buckets, use 'sqlite' to share them")
+    if config.RESPONSE_CACHE_BACKEND == "memory":
+        logger.warning(
+            "TODO_RESPONSE_CACHE_BACKEND=memory: other workers may serve responses up to %ss old after a write, "
+            "use 'sqlite' for exact invalidation", config.RESPONSE_CACHE_TTL_SECONDS,
+        )
+
+
+# ------------------------------
+# ENTRY POINT
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Run the Todo API with several uvicorn workers")
+    parser.add_argument("--host", default=config.HOST)
+    parser.add_argument("--port", type=int, default=config.PORT)
+    parser.add_argument("--workers", type=int, default=config.WORKERS, help="0 = one per CPU core")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    workers = worker_count(args.workers)
+    loop = "uvloop" if has_module("uvloop") else "asyncio"
+    http = "httptools" if has_module("httptools") else "h11"
+
+    prepare_database(workers)
+    warn_per_worker_state(workers)
+    print(f"starting {workers} worker(s) on http://{args.host}:{args.port} (loop={loop}, http={http}, db={config.DB_MODE})")
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=config.KEEP_ALIVE_SECONDS,
+        backlog=config.BACKLOG,
+        limit_concurrency=config.LIMIT_CONCURRENCY or None,
+        limit_max_requests=config.LIMIT_MAX_REQUESTS or None,
+        limit_max_requests_jitter=config.LIMIT_MAX_REQUESTS // 10,   # workers do not all restart at once
+        timeout_graceful_shutdown=config.GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=config.ACCESS_LOG,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+# backend/todo/crud.py
+
+# database work for the todo routes
+# every function takes a sync Session first so it can run through run_db
+# (threadpool in sync mode, AsyncSession.run_sync in async mode)
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import case, column, func, table, text
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select, and_, or_, insert, update, delete
+
+from backend.models import (
+    Todo, User, TodoTombstone, TodoCreate, TodoRead, TodoBulkUpdate, BulkItemResult,
+    TodoChanges, TodoDeleted, TodoStats, DayCount,
+)
+
+
+# raised when If-Match does not match the todo's current version
+class VersionMismatch(Exception):
+    pass
+
+
+# ------------------------------
+# VERSIONS (used for ETags)
+# every write bumps the owner's todo_version and stamps it on the changed todos
+# ------------------------------
+def bump_todo_version(session: Session, owner_id: int) -> int:
+    statement = (
+        update(User)
+        .where(User.id == owner_id)
+        .values(todo_version=User.todo_version + 1)
+        .returning(User.todo_version)
+    )
+    return session.execute(statement).scalar_one()
+
+
+def get_collection_version(session: Session, owner_id: int) -> int:
+    statement = select(User.todo_version).where(User.id == owner_id)
+    return session.exec(statement).one()
+
+
+# completed_at follows the completed flag (used by the stats histograms)
+def stamp_completion(was_completed: bool, changes: dict, now: datetime):
+    if "completed" in changes and bool(changes["completed"]) != bool(was_completed):
+        changes["completed_at"] = now if changes["completed"] else None
+
+
+# ------------------------------
+# CREATE TODO
+# ------------------------------
+def create_todo(session: Session, owner_id: int, todo: TodoCreate) -> TodoRead:
+    new_todo = Todo(
+        title=todo.title,
+        description=todo.description,
+        owner_id=owner_id,
+        version=bump_todo_version(session, owner_id)
+    )
+    session.add(new_todo)
+    session.commit()
+    session.refresh(new_todo)
+    return TodoRead.model_validate(new_todo)
+
+
+# ------------------------------
+# READ COLUMNS (exactly the TodoRead fields, no ORM objects)
+# the *_rows variants return plain dicts for the fast JSON path
+# ------------------------------
+TODO_READ_COLUMNS = tuple(getattr(Todo, name) for name in TodoRead.model_fields)
+
+
+def to_todo_reads(session: Session, statement: Select) -> list[TodoRead]:
+    return [TodoRead.model_validate(row) for row in session.execute(statement)]
+
+
+def to_rows(session: Session, statement: Select) -> list[dict]:
+    return [dict(row) for row in session.execute(statement).mappings()]
+
+
+# ------------------------------
+# LIST TODOS (keyset pagination on created_at, id)
+# ------------------------------
+def list_statement(
+    owner_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    completed: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Select:
+    statement = select(*TODO_READ_COLUMNS).where(Todo.owner_id == owner_id)
+
+    # optional filters
+    if completed is not None:
+        statement = statement.where(Todo.completed == completed)
+    if created_after is not None:
+        statement = statement.where(Todo.created_at >= created_after)
+    if created_before is not None:
+        statement = statement.where(Todo.created_at < created_before)
+
+    # continue after the last row of the previous page
+    if after is not None:
+        last_created_at, last_id = after
+        statement = statement.where(
+            or_(
+                Todo.created_at > last_created_at,
+                and_(Todo.created_at == last_created_at, Todo.id > last_id),
+            )
+        )
+
+    return statement.order_by(Todo.created_at, Todo.id).limit(limit)
+
+
+def list_todos(session: Session, owner_id: int, limit: int, **filters) -> list[TodoRead]:
+    return to_todo_reads(session, list_statement(owner_id, limit, **filters))
+
+
+def list_todo_rows(session: Session, owner_id: int, limit: int, **filters) -> list[dict]:
+    return to_rows(session, list_statement(owner_id, limit, **filters))
+
+
+# ------------------------------
+# EXPORT STATEMENT (columns only, oldest first)
+# ------------------------------
+def export_statement(owner_id: int, completed: Optional[bool] = None) -> Select:
+    statement = (
+        select(Todo.id, Todo.title, Todo.description, Todo.completed,
+               Todo.created_at, Todo.updated_at, Todo.version)
+        .where(Todo.owner_id == owner_id)
+        .order_by(Todo.created_at, Todo.id)
+    )
+    if completed is not None:
+        statement = statement.where(Todo.completed == completed)
+    return statement
+
+
+# ------------------------------
+# FULL-TEXT SEARCH (ranked, owner scoped)
+# uses the todo_fts index on sqlite and a LIKE scan elsewhere
+# ------------------------------
+todo_fts = table("todo_fts", column("rowid"))
+
+
+def fts_query(query: str) -> str:
+    # quote every term so user input is never parsed as FTS syntax,
+    # the last term also matches as a prefix ("buy mil" finds "buy milk")
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_statement(session: Session, owner_id: int, query: str, limit: int, offset: int) -> Select:
+    if session.get_bind().dialect.name == "sqlite":
+        statement = (
+            select(*TODO_READ_COLUMNS)
+            .join(todo_fts, todo_fts.c.rowid == Todo.id)
+            .where(Todo.owner_id == owner_id, text("todo_fts MATCH :query").bindparams(query=fts_query(query)))
+            .order_by(text("bm25(todo_fts, 10.0, 1.0)"), Todo.id)   # title matches rank higher
+        )
+    else:
+        pattern = f"%{query}%"
+        statement = (
+            select(*TODO_READ_COLUMNS)
+            .where(Todo.owner_id == owner_id, or_(Todo.title.ilike(pattern), Todo.description.ilike(pattern)))
+            .order_by(Todo.created_at, Todo.id)
+        )
+
+    return statement.limit(limit).offset(offset)
+
+
+def search_todos(session: Session, owner_id: int, query: str, limit: int, offset: int) -> list[TodoRead]:
+    return to_todo_reads(session, search_statement(session, owner_id, query, limit, offset))
+
+
+def search_todo_rows(session: Session, owner_id: int, query: str, limit: int, offset: int) -> list[dict]:
+    return to_rows(session, search_statement(session, owner_id, query, limit, offset))
+
+
+# ------------------------------
+# GET SINGLE TODO (None if missing or not owned)
+# ------------------------------
+def get_todo(session: Session, owner_id: int, todo_id: int) -> Optional[TodoRead]:
+    todo = session.get(Todo, todo_id)
+    if not todo or todo.owner_id != owner_id:
+        return None
+    return TodoRead.model_validate(todo)
+
+
+def get_todo_version(session: Session, owner_id: int, todo_id: int) -> Optional[int]:
+    # enough for an If-None-Match check, the row itself is not loaded
+    statement = select(Todo.version).where(*owned_todo(owner_id, todo_id))
+    return session.execute(statement).scalar_one_or_none()
+
+
+# ------------------------------
+# SINGLE-TODO WRITES (one ownership scoped UPDATE/DELETE ... RETURNING)
+# the todo gets the owner's next todo_version straight from a subquery,
+# the owner's counter is bumped only after a row matched, so a 404 or 412
+# costs no version and no rollback
+# ------------------------------
+def owned_todo(owner_id: int, todo_id: int, if_match: Optional[set[int]] = None) -> list:
+    conditions = [Todo.id == todo_id, Todo.owner_id == owner_id]
+    if if_match is not None:
+        conditions.append(Todo.version.in_(if_match))
+    return conditions
+
+
+def next_todo_version(owner_id: int):
+    return select(User.todo_version + 1).where(User.id == owner_id).scalar_subquery()
+
+
+def check_missing(session: Session, owner_id: int, todo_id: int, if_match: Optional[set[int]]):
+    # only runs when nothing matched: tell a stale If-Match (412) from a 404
+    if if_match is not None and session.execute(select(Todo.id).where(*owned_todo(owner_id, todo_id))).first():
+        raise VersionMismatch()
+
+
+def claim_version(session: Session, owner_id: int, version: int, todo_id: int):
+    # bump the owner's counter to the version the todo already got; a
+    # concurrent writer on another database (no global write lock) can have
+    # taken it in between, then the todo is moved to the newer version
+    bumped = bump_todo_version(session, owner_id)
+    if bumped != version:
+        session.execute(
+            update(Todo).where(Todo.id == todo_id).values(version=bumped).execution_options(synchronize_session=False)
+        )
+    return bumped
+
+
+# ------------------------------
+# UPDATE TODO (None if missing or not owned)
+# if_match: allowed current versions, VersionMismatch if the todo changed
+# ------------------------------
+def update_todo(
+    session: Session, owner_id: int, todo_id: int, changes: dict, if_match: Optional[set[int]] = None
+) -> Optional[TodoRead]:
+    if not changes:
+        # nothing to write (like bulk updates): same checks, no version bump
+        statement = select(*TODO_READ_COLUMNS).where(*owned_todo(owner_id, todo_id, if_match))
+        row = session.execute(statement).mappings().first()
+        if row is None:
+            check_missing(session, owner_id, todo_id, if_match)
+            return None
+        return TodoRead.model_validate(dict(row))
+
+    now = datetime.utcnow()
+    values = dict(changes, version=next_todo_version(owner_id), updated_at=now)
+    if "completed" in changes:
+        # completed_at only moves when the flag really flips (SET sees the old row)
+        stamp = now if changes["completed"] else None
+        values["completed_at"] = case((Todo.completed == bool(changes["completed"]), Todo.completed_at), else_=stamp)
+
+    statement = (
+        update(Todo)
+        .where(*owned_todo(owner_id, todo_id, if_match))
+        .values(**values)
+        .returning(*TODO_READ_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    row = session.execute(statement).mappings().first()
+    if row is None:
+        check_missing(session, owner_id, todo_id, if_match)
+        session.rollback()
+        return None
+
+    todo = dict(row)
+    todo["version"] = claim_version(session, owner_id, todo["version"], todo_id)
+    session.commit()
+    return TodoRead.model_validate(todo)
+
+
+# ------------------------------
+# DELETE TODO (False if missing or not owned)
+# ------------------------------
+def delete_todo(session: Session, owner_id: int, todo_id: int, if_match: Optional[set[int]] = None) -> bool:
+    statement = (
+        delete(Todo)
+        .where(*owned_todo(owner_id, todo_id, if_match))
+        .returning(Todo.id)
+        .execution_options(synchronize_session=False)
+    )
+    if session.execute(statement).first() is None:
+        check_missing(session, owner_id, todo_id, if_match)
+        session.rollback()
+        return False
+
+    version = bump_todo_version(session, owner_id)
+    session.execute(insert(TodoTombstone).values(todo_id=todo_id, owner_id=owner_id, version=version))
+    session.commit()
+    return True
+
+
+# ------------------------------
+# CHANGES SINCE A CURSOR (cursor = owner's todo_version)
+# changed todos and tombstones are paged together in (version, kind, id)
+# order, kind 0 = changed, 1 = deleted; a page can end inside one version
+# (a bulk write stamps thousands of rows with the same version)
+# ------------------------------
+CHANGED, DELETED = 0, 1
+ChangesKey = Tuple[int, int, int]   # (version, kind, id) of the last item sent
+
+
+def changes_start(since: int) -> ChangesKey:
+    # since=0 is a full snapshot: also todos still at version 0 (written
+    # before versions existed), later cursors skip everything up to since
+    return (0, CHANGED, 0) if since == 0 else (since, DELETED + 1, 0)
+
+
+def after_key(version_column, id_column, kind: int, after: ChangesKey):
+    version, after_kind, after_id = after
+    if kind > after_kind:
+        return version_column >= version
+    if kind == after_kind:
+        return or_(version_column > version, and_(version_column == version, id_column > after_id))
+    return version_column > version
+
+
+def get_changes(
+    session: Session, owner_id: int, after: ChangesKey, limit: int, cursor: int
+) -> Tuple[TodoChanges, Optional[ChangesKey]]:
+    # returns the page and the key to continue after (None on the last page)
+    changed = session.execute(
+        select(*TODO_READ_COLUMNS)
+        .where(Todo.owner_id == owner_id, after_key(Todo.version, Todo.id, CHANGED, after))
+        .order_by(Todo.version, Todo.id)
+        .limit(limit + 1)
+    ).all()
+    deleted = session.exec(
+        select(TodoTombstone)
+        .where(TodoTombstone.owner_id == owner_id, after_key(TodoTombstone.version, TodoTombstone.id, DELETED, after))
+        .order_by(TodoTombstone.version, TodoTombstone.id)
+        .limit(limit + 1)
+    ).all()
+
+    # merge both lists in key order and keep the first page
+    items = sorted(
+        [((todo.version, CHANGED, todo.id), todo) for todo in changed]
+        + [((tombstone.version, DELETED, tombstone.id), tombstone) for tombstone in deleted],
+        key=lambda item: item[0],
+    )
+    page = items[:limit]
+    has_more = len(items) > limit
+    changes = TodoChanges(
+        cursor=cursor,
+        changed=[TodoRead.model_validate(row) for key, row in page if key[1] == CHANGED],
+        deleted=[
+            TodoDeleted(id=row.todo_id, version=row.version, deleted_at=row.deleted_at)
+            for key, row in page if key[1] == DELETED
+        ],
+        has_more=has_more,
+    )
+    return changes, page[-1][0] if has_more else None
+
+
+# ------------------------------
+# STATS (GROUP BY queries, nothing is loaded row by row)
+# ------------------------------
+def count_per_day(session: Session, owner_id: int, column, since: datetime) -> list[DayCount]:
+    day = func.date(column)
+    statement = (
+        select(day, func.count())
+        .where(Todo.owner_id == owner_id, column >= since)
+        .group_by(day)
+        .order_by(day)
+    )
+    return [DayCount(day=row[0], count=row[1]) for row in session.exec(statement).all()]
+
+
+def get_stats(session: Session, owner_id: int, days: int) -> TodoStats:
+    total, completed = session.exec(
+        select(func.count(), func.coalesce(func.sum(case((Todo.completed, 1), else_=0)), 0))
+        .where(Todo.owner_id == owner_id)
+    ).one()
+
+    # histograms start at midnight (UTC) days - 1 days ago
+    since = datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+    return TodoStats(
+        total=total,
+        completed=completed,
+        open=total - completed,
+        days=days,
+        created_per_day=count_per_day(session, owner_id, Todo.created_at, since),
+        completed_per_day=count_per_day(session, owner_id, Todo.completed_at, since),
+    )
+
+
+# ------------------------------
+# BULK HELPERS
+# ------------------------------
+def get_owned_todos(session: Session, owner_id: int, ids: list[int]) -> dict[int, Todo]:
+    """Load the todos from ids that belong to owner_id with a single query."""
+    if not ids:
+        return {}
+    statement = select(Todo).where(Todo.owner_id == owner_id, Todo.id.in_(set(ids)))
+    return {todo.id: todo for todo in session.exec(statement).all()}
+
+
+# ------------------------------
+# BULK CREATE (one transaction, one multi-row INSERT)
+# ------------------------------
+def bulk_create_todos(session: Session, owner_id: int, todos: list[TodoCreate]) -> list[BulkItemResult]:
+    if not todos:
+        return []
+
+    version = bump_todo_version(session, owner_id)
+    rows = [
+        {"title": todo.title, "description": todo.description, "owner_id": owner_id, "version": version}
+        for todo in todos
+    ]
+    statement = insert(Todo).returning(Todo, sort_by_parameter_order=True)
+    created = session.scalars(statement, rows).all()
+    results = [
+        BulkItemResult(index=index, id=todo.id, status="created", todo=TodoRead.model_validate(todo))
+        for index, todo in enumerate(created)
+    ]
+    session.commit()
+    return results
+
+
+# ------------------------------
+# INSERT A BATCH (import path, executemany INSERT without RETURNING)
+# ------------------------------
+def insert_todos(session: Session, owner_id: int, todos: list[TodoCreate]) -> int:
+    if not todos:
+        return 0
+
+    version = bump_todo_version(session, owner_id)
+    rows = [
+        {"title": todo.title, "description": todo.description, "owner_id": owner_id, "version": version}
+        for todo in todos
+    ]
+    session.execute(insert(Todo), rows)
+    session.commit()
+    return len(rows)
+
+
+# ------------------------------
+# BULK UPDATE (ownership checked with one query, executemany UPDATE)
+# ------------------------------
+def bulk_update_todos(session: Session, owner_id: int, items: list[TodoBulkUpdate]) -> list[BulkItemResult]:
+    owned = get_owned_todos(session, owner_id, [item.id for item in items])
+
+    results = []
+    params = []
+    current = {todo_id: todo.model_dump() for todo_id, todo in owned.items()}
+    version = bump_todo_version(session, owner_id) if owned else None
+    now = datetime.utcnow()
+    for index, item in enumerate(items):
+        if item.id not in current:
+            results.append(BulkItemResult(index=index, id=item.id, status="not_found"))
+            continue
+        changes = item.model_dump(exclude_unset=True, exclude={"id"})
+        if changes:
+            stamp_completion(current[item.id]["completed"], changes, now)
+            changes["version"] = version
+            changes["updated_at"] = now
+        current[item.id].update(changes)
+        results.append(BulkItemResult(
+            index=index, id=item.id, status="updated", todo=TodoRead.model_validate(current[item.id])
+        ))
+        if changes:
+            params.append({"id": item.id, **changes})
+
+    # executemany UPDATE by primary key
+    if params:
+        session.execute(update(Todo), params)
+        session.commit()
+    else:
+        session.rollback()   # nothing changed, keep the old version
+    return results
+
+
+# ------------------------------
+# BULK DELETE (one DELETE ... WHERE id IN)
+# ------------------------------
+def bulk_delete_todos(session: Session, owner_id: int, ids: list[int]) -> list[BulkItemResult]:
+    owned = set(get_owned_todos(session, owner_id, ids))
+
+    if owned:
+        version = bump_todo_version(session, owner_id)
+        session.execute(
+            insert(TodoTombstone),
+            [{"todo_id": todo_id, "owner_id": owner_id, "version": version} for todo_id in owned],
+        )
+        statement = delete(Todo).where(Todo.owner_id == owner_id, Todo.id.in_(owned))
+        session.execute(statement)
+        session.commit()
+
+    return [
+        BulkItemResult(index=index, id=todo_id, status="deleted" if todo_id in owned else "not_found")
+        for index, todo_id in enumerate(ids)
+    ]
@@ -0,0 +1,50 @@
+# backend/todo/export.py
+
+# streaming export of a user's todos as NDJSON or CSV
+# rows are read in chunks and encoded chunk by chunk, so memory use
+# does not grow with the number of todos
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+
+from backend.database import stream_rows
+
+# columns written to the export, in order
+EXPORT_COLUMNS = ("id", "title", "description", "completed", "created_at", "updated_at", "version")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def format_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def ndjson_chunk(rows: list[Row]) -> bytes:
+    lines = (
+        json.dumps({column: format_value(value) for column, value in zip(EXPORT_COLUMNS, row)})
+        for row in rows
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def csv_chunk(rows: list[list]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([format_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_stream(statement: Select, export_format: str, chunk_size: int) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        yield csv_chunk([EXPORT_COLUMNS])   # header row
+    async for rows in stream_rows(statement, chunk_size):
+        yield csv_chunk(rows) if export_format == "csv" else ndjson_chunk(rows)
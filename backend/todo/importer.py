@@ -0,0 +1,128 @@
+# backend/todo/importer.py
+
+# streaming import of todos from NDJSON or CSV
+# the request body is parsed line by line and inserted in batches, so
+# memory use stays at one batch (and one line of at most max_line_bytes) no
+# matter how large the upload is
+
+import csv
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+from pydantic import ValidationError
+
+from backend.models import TodoCreate, ImportLineError, TodoImportResult
+
+
+# ------------------------------
+# SPLIT A BYTE STREAM INTO NUMBERED LINES
+# only the new chunk is searched for line breaks, a line longer than
+# max_line_bytes is yielded as None and the rest of it is skipped
+# ------------------------------
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    pending = bytearray()   # start of the current line from earlier chunks
+    too_long = False
+    line_number = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            line_number += 1
+            if too_long or len(pending) + end - start > max_line_bytes:
+                yield line_number, None
+            else:
+                pending += chunk[start:end]
+                yield line_number, bytes(pending)
+            pending.clear()
+            too_long = False
+            start = end + 1
+        if not too_long:
+            pending += chunk[start:]
+            if len(pending) > max_line_bytes:
+                pending.clear()
+                too_long = True
+    if too_long:
+        yield line_number + 1, None
+    elif pending:
+        yield line_number + 1, bytes(pending)
+
+
+# ------------------------------
+# PARSE ONE RECORD
+# csv records cannot contain line breaks inside quoted fields
+# ------------------------------
+def parse_ndjson(text: str) -> TodoCreate:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return TodoCreate.model_validate(data)
+
+
+def parse_csv(text: str, header: list[str]) -> TodoCreate:
+    row = next(csv.reader([text]))
+    data = dict(zip(header, row))
+    # csv has no null, an empty description means none
+    return TodoCreate.model_validate({
+        "title": data.get("title"),
+        "description": data.get("description") or None,
+    })
+
+
+def describe_error(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return f"{field}: {error['msg']}" if field else error["msg"]
+    return str(exc)
+
+
+# ------------------------------
+# IMPORT
+# insert_batch is called with each full batch of TodoCreate and
+# returns the number of rows inserted
+# ------------------------------
+async def import_todos(
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    insert_batch: Callable[[list[TodoCreate]], Awaitable[int]],
+    batch_size: int,
+    max_errors: int,
+    max_line_bytes: int,
+) -> TodoImportResult:
+    imported = 0
+    failed = 0
+    errors: list[ImportLineError] = []
+    batch: list[TodoCreate] = []
+    header: Optional[list[str]] = None
+
+    async for line_number, raw_line in iter_lines(chunks, max_line_bytes):
+        try:
+            if raw_line is None:
+                raise ValueError(f"line is longer than {max_line_bytes} bytes")
+            text = raw_line.decode("utf-8").rstrip("\r")
+            if not text.strip():
+                continue
+            if import_format == "csv" and header is None:
+                columns = [name.strip() for name in next(csv.reader([text]))]
+                if "title" not in columns:
+                    raise ValueError("csv header must contain a title column")
+                header = columns
+                continue
+            todo = parse_csv(text, header) if import_format == "csv" else parse_ndjson(text)
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            # json and pydantic errors are ValueErrors too
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append(ImportLineError(line=line_number, error=describe_error(exc)))
+            if header is None and import_format == "csv":
+                break   # without a header nothing else can be read
+            continue
+
+        batch.append(todo)
+        if len(batch) >= batch_size:
+            imported += await insert_batch(batch)
+            batch = []
+
+    if batch:
+        imported += await insert_batch(batch)
+
+    return TodoImportResult(imported=imported, failed=failed, errors=errors)
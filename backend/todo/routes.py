@@ -1,99 +1,447 @@
 # backend/todo/routes.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import base64
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
 
-from backend.models import Todo, TodoCreate, TodoUpdate, TodoRead, User
-from backend.database import get_session
-from backend.auth.jwt_handler import get_current_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from backend.models import (
+    TodoCreate, TodoUpdate, TodoRead, Principal,
+    TodoBulkUpdate, TodoBulkDelete, BulkItemResult, TodoChanges, TodoImportResult, TodoStats,
+)
+from backend.database import get_session, run_db
+from backend.auth.jwt_handler import get_current_principal
+from backend.ratelimit import rate_limit
+from backend.config import (
+    EXPORT_CHUNK_SIZE, FAST_JSON_RESPONSES, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, IMPORT_MAX_LINE_BYTES,
+)
+from backend.responses import FastJSONResponse
+from backend.response_cache import CachedResponse, response_cache
+from backend.todo import crud
+from backend.todo.export import MEDIA_TYPES, export_stream
+from backend.todo.importer import import_todos as run_import
 
 router = APIRouter(prefix="/todos", tags=["Todos"])
 
+# page size limits for list_todos
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# page size limits for get_changes
+DEFAULT_CHANGES_PAGE_SIZE = 1000
+MAX_CHANGES_PAGE_SIZE = 5000
+
+# max number of items in one bulk request
+MAX_BULK_ITEMS = 5000
+
+
+# ------------------------------
+# CURSOR HELPERS (keyset pagination on created_at, id)
+# ------------------------------
+def encode_cursor(created_at: datetime, todo_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{todo_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, todo_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(todo_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# page of /todos/changes: (version, kind, id) of the last item sent
+def encode_changes_cursor(key: Tuple[int, int, int]) -> str:
+    return base64.urlsafe_b64encode("|".join(map(str, key)).encode()).decode()
+
+
+def decode_changes_cursor(cursor: str) -> Tuple[int, int, int]:
+    try:
+        version, kind, todo_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return int(version), int(kind), int(todo_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ------------------------------
+# ETAG HELPERS
+# a todo's ETag is its id + version, a list ETag is the owner's collection
+# version + a hash of the query string (different pages differ)
+# ------------------------------
+def todo_etag(todo: TodoRead) -> str:
+    return version_etag(todo.id, todo.version)
+
+
+def version_etag(todo_id: int, version: int) -> str:
+    return f'"{todo_id}.{version}"'
+
+
+def collection_etag(user_id: int, version: int, request: Request) -> str:
+    query_hash = hashlib.sha1(str(sorted(request.query_params.multi_items())).encode()).hexdigest()[:12]
+    return f'W/"{user_id}.{version}.{query_hash}"'
+
+
+def parse_etags(header: str) -> list[str]:
+    # weak comparison: W/ prefixes are ignored
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def if_match_versions(header: Optional[str], todo_id: int) -> Optional[set[int]]:
+    # None means no precondition, an empty set never matches
+    if header is None:
+        return None
+    versions = set()
+    for tag in parse_etags(header):
+        if tag == "*":
+            return None
+        todo_part, _, version = tag.strip('"').partition(".")
+        if todo_part == str(todo_id) and version.isdigit():
+            versions.add(int(version))
+    return versions
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+# ------------------------------
+# RESPONSE CACHE HELPERS (see backend/response_cache.py)
+# ------------------------------
+def cached_reply(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    etag = cached.headers.get("ETag")
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(cached.body, media_type="application/json", headers=cached.headers)
+
+
+async def cache_reply(user_id: int, key: str, generation: int, content, headers: dict, scoped: bool) -> Response:
+    response = FastJSONResponse(content, headers=headers)
+    await response_cache.set(user_id, key, response.body, headers, generation, scoped)
+    return response
+
 
 # ------------------------------
 # CREATE TODO (only logged in user)
 # ------------------------------
-@router.post("/", response_model=TodoRead)
-def create_todo(
+@router.post("/", response_model=TodoRead, dependencies=[Depends(rate_limit("todos"))])
+async def create_todo(
     todo: TodoCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    new_todo = Todo(
-        title=todo.title,
-        description=todo.description,
-        owner_id=current_user.id
-    )
-    session.add(new_todo)
-    session.commit()
-    session.refresh(new_todo)
+    new_todo = await run_db(session, crud.create_todo, current_user.id, todo)
+    await response_cache.invalidate(current_user.id)
+    response.headers["ETag"] = todo_etag(new_todo)
     return new_todo
 
 
 # ------------------------------
-# GET ALL TODOS for current user
+# BULK HELPERS
+# ------------------------------
+def check_bulk_size(items: list):
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per bulk request")
+
+
+# ------------------------------
+# BULK CREATE TODOS (one transaction, one multi-row INSERT)
+# ------------------------------
+@router.post("/bulk", response_model=list[BulkItemResult], dependencies=[Depends(rate_limit("bulk"))])
+async def bulk_create_todos(
+    todos: list[TodoCreate],
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    check_bulk_size(todos)
+    results = await run_db(session, crud.bulk_create_todos, current_user.id, todos)
+    await response_cache.invalidate(current_user.id)
+    return results
+
+
+# ------------------------------
+# BULK UPDATE TODOS (ownership checked with one query)
+# ------------------------------
+@router.patch("/bulk", response_model=list[BulkItemResult], dependencies=[Depends(rate_limit("bulk"))])
+async def bulk_update_todos(
+    items: list[TodoBulkUpdate],
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    check_bulk_size(items)
+    results = await run_db(session, crud.bulk_update_todos, current_user.id, items)
+    await response_cache.invalidate(current_user.id, [item.id for item in items])
+    return results
+
+
+# ------------------------------
+# BULK DELETE TODOS (one DELETE ... WHERE id IN)
+# ------------------------------
+@router.delete("/bulk", response_model=list[BulkItemResult], dependencies=[Depends(rate_limit("bulk"))])
+async def bulk_delete_todos(
+    data: TodoBulkDelete,
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    check_bulk_size(data.ids)
+    results = await run_db(session, crud.bulk_delete_todos, current_user.id, data.ids)
+    await response_cache.invalidate(current_user.id, data.ids)
+    return results
+
+
+# ------------------------------
+# IMPORT TODOS from an NDJSON or CSV body (streamed, batched inserts)
+# format defaults to csv for text/csv bodies, ndjson otherwise
+# ------------------------------
+@router.post("/import", response_model=TodoImportResult, dependencies=[Depends(rate_limit("bulk"))])
+async def import_todos(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+
+    async def insert_batch(todos: list[TodoCreate]) -> int:
+        inserted = await run_db(session, crud.insert_todos, current_user.id, todos)
+        await response_cache.invalidate(current_user.id)
+        return inserted
+
+    return await run_import(
+        request.stream(), format, insert_batch, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, IMPORT_MAX_LINE_BYTES,
+    )
+
+
+# ------------------------------
+# GET TODOS for current user (one page at a time)
+# the next page cursor is returned in the X-Next-Cursor header
+# If-None-Match answers 304 after a single version lookup
+# with FAST_JSON_RESPONSES rows go straight from the query to orjson
+# pages are served from the response cache until the user writes again
 # ------------------------------
-@router.get("/", response_model=list[TodoRead])
-def list_todos(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+@router.get("/", response_model=list[TodoRead], dependencies=[Depends(rate_limit("list"))])
+async def list_todos(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    completed: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    if_none_match: Optional[str] = Header(None),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    statement = select(Todo).where(Todo.owner_id == current_user.id)
-    todos = session.exec(statement).all()
+    after = decode_cursor(cursor) if cursor else None
+
+    cache_key = f"list:{sorted(request.query_params.multi_items())}"
+    cached, generation = await response_cache.get(current_user.id, cache_key)
+    if cached is not None:
+        return cached_reply(cached, if_none_match)
+
+    # read the version before the rows so the ETag is never newer than the data
+    version = await run_db(session, crud.get_collection_version, current_user.id)
+    etag = collection_etag(current_user.id, version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # fetch one extra row to know if there is a next page
+    filters = dict(after=after, completed=completed, created_after=created_after, created_before=created_before)
+    if FAST_JSON_RESPONSES:
+        rows = await run_db(session, crud.list_todo_rows, current_user.id, limit + 1, **filters)
+        headers = {"ETag": etag}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        if response_cache.enabled:
+            return await cache_reply(current_user.id, cache_key, generation, rows, headers, scoped=True)
+        return FastJSONResponse(rows, headers=headers)
+
+    todos = await run_db(session, crud.list_todos, current_user.id, limit + 1, **filters)
+    headers = {"ETag": etag}
+    if len(todos) > limit:
+        todos = todos[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(todos[-1].created_at, todos[-1].id)
+    if response_cache.enabled:
+        content = [todo.model_dump() for todo in todos]
+        return await cache_reply(current_user.id, cache_key, generation, content, headers, scoped=True)
+    response.headers.update(headers)
     return todos
 
 
+# ------------------------------
+# GET CHANGES since a cursor (incremental sync)
+# start with since=0, then pass the returned cursor as since next time
+# ------------------------------
+@router.get("/changes", response_model=TodoChanges, dependencies=[Depends(rate_limit("list"))])
+async def get_changes(
+    since: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="`next` of the previous page while `has_more`"),
+    limit: int = Query(DEFAULT_CHANGES_PAGE_SIZE, ge=1, le=MAX_CHANGES_PAGE_SIZE),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # read the version first so nothing written meanwhile is skipped next time
+    version = await run_db(session, crud.get_collection_version, current_user.id)
+    if after is not None:
+        start = decode_changes_cursor(after)
+    elif since > version:
+        raise HTTPException(status_code=400, detail="Cursor is ahead of the server")
+    else:
+        start = crud.changes_start(since)
+
+    changes, last_key = await run_db(session, crud.get_changes, current_user.id, start, limit, version)
+    if last_key is not None:
+        changes.next = encode_changes_cursor(last_key)
+    return changes
+
+
+# ------------------------------
+# SEARCH TODOS by title/description (ranked, paginated with offset)
+# ------------------------------
+@router.get("/search", response_model=list[TodoRead], dependencies=[Depends(rate_limit("list"))])
+async def search_todos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    if not q.split():
+        return []
+    if FAST_JSON_RESPONSES:
+        return FastJSONResponse(await run_db(session, crud.search_todo_rows, current_user.id, q, limit, offset))
+    return await run_db(session, crud.search_todos, current_user.id, q, limit, offset)
+
+
+# ------------------------------
+# STATS: totals and per-day created/completed counts for the last `days` days
+# ------------------------------
+@router.get("/stats", response_model=TodoStats, dependencies=[Depends(rate_limit("list"))])
+async def get_stats(
+    days: int = Query(30, ge=1, le=366),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    return await run_db(session, crud.get_stats, current_user.id, days)
+
+
+# ------------------------------
+# EXPORT TODOS as NDJSON or CSV (streamed, constant memory)
+# ------------------------------
+@router.get("/export", dependencies=[Depends(rate_limit("list"))])
+async def export_todos(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    completed: Optional[bool] = None,
+    current_user: Principal = Depends(get_current_principal)
+):
+    statement = crud.export_statement(current_user.id, completed)
+    return StreamingResponse(
+        export_stream(statement, format, EXPORT_CHUNK_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="todos.{format}"'},
+    )
+
+
 # ------------------------------
 # GET SINGLE TODO by ID
 # ------------------------------
-@router.get("/{todo_id}", response_model=TodoRead)
-def get_todo(
+@router.get("/{todo_id}", response_model=TodoRead, dependencies=[Depends(rate_limit("todos"))])
+async def get_todo(
     todo_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    todo = session.get(Todo, todo_id)
-    if not todo or todo.owner_id != current_user.id:
+    cache_key = f"todo:{todo_id}"
+    cached, generation = await response_cache.get(current_user.id, cache_key)
+    if cached is not None:
+        return cached_reply(cached, if_none_match)
+
+    # revalidation: compare the version first, load the row only when it changed
+    if if_none_match:
+        version = await run_db(session, crud.get_todo_version, current_user.id, todo_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        etag = version_etag(todo_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    todo = await run_db(session, crud.get_todo, current_user.id, todo_id)
+    if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
+
+    etag = todo_etag(todo)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if response_cache.enabled:
+        return await cache_reply(current_user.id, cache_key, generation, todo.model_dump(), {"ETag": etag}, scoped=False)
+    response.headers["ETag"] = etag
     return todo
 
 
 # ------------------------------
-# UPDATE TODO
+# UPDATE TODO (If-Match makes it conditional, 412 if the todo changed)
 # ------------------------------
-@router.put("/{todo_id}", response_model=TodoRead)
-def update_todo(
+@router.put("/{todo_id}", response_model=TodoRead, dependencies=[Depends(rate_limit("todos"))])
+async def update_todo(
     todo_id: int,
     todo_data: TodoUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    todo = session.get(Todo, todo_id)
-    if not todo or todo.owner_id != current_user.id:
+    changes = todo_data.model_dump(exclude_unset=True)
+    try:
+        todo = await run_db(
+            session, crud.update_todo, current_user.id, todo_id, changes,
+            if_match=if_match_versions(if_match, todo_id),
+        )
+    except crud.VersionMismatch:
+        raise HTTPException(status_code=412, detail="Todo was modified by another request")
+    if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
-    for field, value in todo_data.dict(exclude_unset=True).items():
-        setattr(todo, field, value)
-
-    session.add(todo)
-    session.commit()
-    session.refresh(todo)
+    await response_cache.invalidate(current_user.id, [todo_id])
+    response.headers["ETag"] = todo_etag(todo)
     return todo
 
 
 # ------------------------------
-# DELETE TODO
+# DELETE TODO (If-Match makes it conditional, 412 if the todo changed)
 # ------------------------------
-@router.delete("/{todo_id}")
-def delete_todo(
+@router.delete("/{todo_id}", dependencies=[Depends(rate_limit("todos"))])
+async def delete_todo(
     todo_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    if_match: Optional[str] = Header(None),
+    session=Depends(get_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    todo = session.get(Todo, todo_id)
-    if not todo or todo.owner_id != current_user.id:
+    try:
+        deleted = await run_db(
+            session, crud.delete_todo, current_user.id, todo_id,
+            if_match=if_match_versions(if_match, todo_id),
+        )
+    except crud.VersionMismatch:
+        raise HTTPException(status_code=412, detail="Todo was modified by another request")
+    if not deleted:
         raise HTTPException(status_code=404, detail="Todo not found")
 
-    session.delete(todo)
-    session.commit()
+    await response_cache.invalidate(current_user.id, [todo_id])
     return {"message": f"Todo {todo_id} deleted successfully"}
@@ -0,0 +1,298 @@
+# benchmarks/bench_api.py
+#
+# Load test for the Todo API.
+#
+# Seeds a database with users and todos, then drives the app either
+# in-process (ASGI transport, no network) or through the production launcher
+# (python -m backend.serve), and reports p50/p95/p99 latency and
+# requests/second per scenario. Results are written as JSON so runs can be
+# compared across commits.
+#
+# The response cache is off by default: the read scenarios repeat the same
+# URLs, so with it they would measure cache hits instead of the list/get cost.
+# Set TODO_RESPONSE_CACHE_BACKEND=memory (or sqlite) to measure the cached path.
+#
+# usage (needs httpx):
+#   python -m benchmarks.bench_api --users 20 --todos 1000
+#   python -m benchmarks.bench_api --server --workers 4 --output after.json --compare before.json
+#   TODO_RESPONSE_CACHE_BACKEND=memory python -m benchmarks.bench_api --output cached.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_PASSWORD = "bench-password"
+
+# scenario name -> (method, url template), {todo_id} is filled per request
+SCENARIOS = {
+    "signup": ("POST", "/auth/signup"),
+    "login": ("POST", "/auth/token"),
+    "whoami": ("GET", "/auth/whoami"),
+    "list_10": ("GET", "/todos/?limit=10"),
+    "list_100": ("GET", "/todos/?limit=100"),
+    "list_1000": ("GET", "/todos/?limit=1000"),
+    "get": ("GET", "/todos/{todo_id}"),
+    "create": ("POST", "/todos/"),
+    "update": ("PUT", "/todos/{todo_id}"),
+    "delete": ("DELETE", "/todos/{todo_id}"),
+}
+
+
+# ------------------------------
+# SEEDING (straight through the models, not the API)
+# ------------------------------
+def seed(users: int, todos_per_user: int) -> dict:
+    from sqlmodel import Session, insert, select
+
+    from backend.auth.hashing import hash_password
+    from backend.auth.jwt_handler import create_access_token
+    from backend.database import create_db_and_tables, engine
+    from backend.models import Todo, User
+
+    create_db_and_tables()
+    hashed = hash_password(BENCH_PASSWORD)   # one bcrypt call shared by every user
+
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"username": f"bench{i}", "hashed_password": hashed, "created_at": datetime.utcnow(), "todo_version": 1}
+            for i in range(users)
+        ])
+        user_ids = session.exec(select(User.id).where(User.username.startswith("bench"))).all()
+        for user_id in user_ids:
+            session.execute(insert(Todo), [
+                {"title": f"todo {n}", "description": "seeded", "owner_id": user_id, "version": 1}
+                for n in range(todos_per_user)
+            ])
+        session.commit()
+
+        accounts = []
+        for user_id, username in session.exec(select(User.id, User.username).where(User.username.startswith("bench"))):
+            todo_ids = session.exec(select(Todo.id).where(Todo.owner_id == user_id)).all()
+            accounts.append({
+                "username": username,
+                "token": create_access_token({"sub": username, "uid": user_id, "ver": 0}),
+                "todo_ids": list(todo_ids),
+            })
+    return {"accounts": accounts}
+
+
+# ------------------------------
+# STATS
+# ------------------------------
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+# ------------------------------
+# SCENARIO RUNNER
+# ------------------------------
+def build_request(name: str, index: int, accounts: list, created: list) -> dict:
+    method, url = SCENARIOS[name]
+    account = accounts[index % len(accounts)]
+    headers = {"Authorization": f"Bearer {account['token']}"}
+
+    if name == "signup":
+        return {"method": method, "url": url, "json": {"username": f"new{index}-{random.random()}", "password": BENCH_PASSWORD}}
+    if name == "login":
+        return {"method": method, "url": url, "data": {"username": account["username"], "password": BENCH_PASSWORD}}
+    if name == "create":
+        return {"method": method, "url": url, "headers": headers, "json": {"title": f"bench {index}"}}
+    if name in ("get", "update"):
+        todo_id = random.choice(account["todo_ids"])
+        body = {"json": {"completed": index % 2 == 0}} if name == "update" else {}
+        return {"method": method, "url": url.format(todo_id=todo_id), "headers": headers, **body}
+    if name == "delete":
+        # delete the todos made by the create scenario
+        owner_token, todo_id = created[index % len(created)]
+        return {"method": method, "url": url.format(todo_id=todo_id), "headers": {"Authorization": f"Bearer {owner_token}"}}
+    return {"method": method, "url": url, "headers": headers}
+
+
+async def run_scenario(client, name: str, requests: int, concurrency: int, accounts: list, created: list) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            request = build_request(name, index, accounts, created)
+            started = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif name == "create":
+                created.append((request["headers"]["Authorization"].split()[1], response.json()["id"]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_all(client, args, accounts: list) -> dict:
+    results = {}
+    created: list = []
+    for name in args.scenarios:
+        # bcrypt routes are much slower, run fewer of them
+        count = args.auth_requests if name in ("signup", "login") else args.requests
+        if name == "delete":
+            count = min(count, len(created))
+            if not count:
+                continue
+        # warm up pools and caches first (only scenarios that do not create or remove data)
+        if args.warmup and name not in ("signup", "create", "delete"):
+            await run_scenario(client, name, args.warmup, args.concurrency, accounts, created)
+        results[name] = await run_scenario(client, name, count, args.concurrency, accounts, created)
+        print(f"{name:>10}: {json.dumps(results[name])}")
+    return results
+
+
+# ------------------------------
+# TARGETS: in-process ASGI app or uvicorn workers
+# ------------------------------
+async def bench_in_process(args, accounts: list) -> dict:
+    import httpx
+
+    from backend.auth.hashing import shutdown_hash_pool
+    from backend.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_all(client, args, accounts)
+    finally:
+        shutdown_hash_pool()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_server(args, accounts: list) -> dict:
+    import httpx
+
+    # the same launcher as in production: schema setup once, shared stores and
+    # split hashing pools with several workers
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for _ in range(100):   # wait for the workers to come up
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            return await run_all(client, args, accounts)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# ------------------------------
+# COMPARE WITH A PREVIOUS RUN
+# ------------------------------
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as file:
+        baseline = json.load(file)["results"]
+    print(f"\ncompared with {baseline_path}:")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        p95_change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rps_change = (current["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        print(f"{name:>10}: p95 {before['p95_ms']} -> {current['p95_ms']} ms ({p95_change:+.1f}%), "
+              f"rps {before['rps']} -> {current['rps']} ({rps_change:+.1f}%)")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Todo API load test")
+    parser.add_argument("--users", type=int, default=10, help="users to seed")
+    parser.add_argument("--todos", type=int, default=1000, help="todos to seed per user")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--auth-requests", type=int, default=50, help="requests for signup/login")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each read scenario")
+    parser.add_argument("--server", action="store_true", help="run against backend.serve workers instead of in-process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="workers for --server")
+    parser.add_argument("--database", help="database file to seed (default: a fresh temp file)")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    # the backend reads its settings at import time, so set them first
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="todo-bench-"), "database.db")
+    os.environ["TODO_DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("TODO_RATE_LIMIT_ENABLED", "false")   # measure the app, not the limiter
+    os.environ.setdefault("TODO_RESPONSE_CACHE_BACKEND", "off")   # measure the reads, not cache hits
+
+    print(f"seeding {args.users} users x {args.todos} todos into {database}")
+    seeded = seed(args.users, args.todos)
+
+    runner = bench_server if args.server else bench_in_process
+    results = asyncio.run(runner(args, seeded["accounts"]))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "target": f"backend.serve x{args.workers}" if args.server else "in-process",
+            "db_mode": os.getenv("TODO_DB_MODE", "sync"),
+            "response_cache": os.environ["TODO_RESPONSE_CACHE_BACKEND"],
+            "users": args.users,
+            "todos_per_user": args.todos,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_cli_startup.py
+#
+# Startup time of cli.py for quick commands.
+#
+# Runs each command in a fresh interpreter (in an empty temp dir, so there is
+# no token.txt and nothing touches the network) and compares the median wall
+# time with a bare "python -c pass". Fails (exit 1) when a command needs more
+# than --budget-ms on top of the interpreter, or when it imports requests.
+#
+# usage:
+#   python -m benchmarks.bench_cli_startup
+#   python -m benchmarks.bench_cli_startup --runs 50 --budget-ms 30
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py")
+
+# commands that must start fast (whoami stops early without a token)
+COMMANDS = {
+    "--help": ["--help"],
+    "logout": ["logout"],
+    "whoami": ["--quiet", "whoami"],
+}
+
+# modules the quick commands must not import
+HEAVY_MODULES = ("requests", "urllib3", "json", "concurrent.futures")
+
+
+def time_run(argv: list, cwd: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def median_ms(argv: list, cwd: str, runs: int) -> float:
+    time_run(argv, cwd)   # warm the OS file cache
+    return statistics.median(time_run(argv, cwd) for _ in range(runs)) * 1000
+
+
+def imported_modules(args: list, cwd: str) -> set:
+    # -X importtime lists every module imported, one per line on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", CLI, *args], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cli.py startup time")
+    parser.add_argument("--runs", type=int, default=20, help="runs per command")
+    parser.add_argument("--budget-ms", type=float, default=40.0, help="allowed time on top of a bare interpreter")
+    args = parser.parse_args()
+
+    cwd = tempfile.mkdtemp(prefix="todo-cli-")
+    baseline = median_ms([sys.executable, "-c", "pass"], cwd, args.runs)
+    print(f"{'python -c pass':<16} {baseline:7.1f} ms")
+
+    failed = False
+    for name, command in COMMANDS.items():
+        elapsed = median_ms([sys.executable, CLI, *command], cwd, args.runs)
+        heavy = sorted(module for module in imported_modules(command, cwd) if module in HEAVY_MODULES)
+        over_budget = elapsed - baseline > args.budget_ms
+        failed = failed or over_budget or bool(heavy)
+        status = "OVER BUDGET" if over_budget else "ok"
+        extra = f"  imports {', '.join(heavy)}" if heavy else ""
+        print(f"{name:<16} {elapsed:7.1f} ms  (+{elapsed - baseline:.1f} ms, budget {args.budget_ms:.0f}) {status}{extra}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_json.py
+#
+# Compares the two response paths of GET /todos/ and /todos/search:
+#   response_model  TodoRead validation + FastAPI encoding (TODO_FAST_JSON_RESPONSES=false)
+#   fast_json       column rows as dicts + orjson (the default)
+#
+# Requests run one at a time in-process so the numbers show CPU cost per
+# request, not concurrency. Both paths must return the same JSON.
+#
+# usage (needs httpx):
+#   python -m benchmarks.bench_json --todos 2000 --limits 100 1000
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.bench_api import seed, summarize
+
+PATHS = {"response_model": False, "fast_json": True}
+
+
+async def run(args, account: dict) -> dict:
+    import httpx
+
+    from backend.auth.hashing import shutdown_hash_pool
+    from backend.main import app
+    from backend.todo import routes
+
+    headers = {"Authorization": f"Bearer {account['token']}"}
+    urls = [f"/todos/?limit={limit}" for limit in args.limits] + [f"/todos/search?q=todo&limit={args.limits[-1]}"]
+    results = {}
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for url in urls:
+                bodies = {}
+                for name, fast in PATHS.items():
+                    routes.FAST_JSON_RESPONSES = fast
+                    for _ in range(args.warmup):
+                        await client.get(url, headers=headers)
+
+                    latencies = []
+                    errors = 0
+                    started = time.perf_counter()
+                    for _ in range(args.requests):
+                        request_started = time.perf_counter()
+                        response = await client.get(url, headers=headers)
+                        latencies.append(time.perf_counter() - request_started)
+                        errors += response.status_code >= 400
+                    results[f"{url} {name}"] = summarize(latencies, errors, time.perf_counter() - started)
+                    bodies[name] = response.json()
+
+                if bodies["response_model"] != bodies["fast_json"]:
+                    raise SystemExit(f"{url}: the two paths returned different JSON")
+                report(url, results[f"{url} response_model"], results[f"{url} fast_json"])
+    finally:
+        shutdown_hash_pool()
+    return results
+
+
+def report(url: str, before: dict, after: dict):
+    speedup = before["p50_ms"] / after["p50_ms"] if after["p50_ms"] else 0.0
+    print(f"{url:<40} response_model p50 {before['p50_ms']:>7} ms | fast_json p50 {after['p50_ms']:>7} ms | x{speedup:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="response_model vs fast JSON path")
+    parser.add_argument("--todos", type=int, default=2000, help="todos to seed")
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000], help="page sizes to request")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per path and url")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests first")
+    args = parser.parse_args()
+
+    # the backend reads its settings at import time, so set them first
+    database = os.path.join(tempfile.mkdtemp(prefix="todo-bench-"), "database.db")
+    os.environ["TODO_DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("TODO_RATE_LIMIT_ENABLED", "false")   # measure the app, not the limiter
+    os.environ.setdefault("TODO_RESPONSE_CACHE_BACKEND", "off")   # every request must run the path
+
+    print(f"seeding 1 user x {args.todos} todos into {database}")
+    account = seed(1, args.todos)["accounts"][0]
+    asyncio.run(run(args, account))
+
+
+if __name__ == "__main__":
+    main()
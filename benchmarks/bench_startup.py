@@ -0,0 +1,158 @@
+# benchmarks/bench_startup.py
+#
+# Cold start of an API worker.
+#
+# Imports backend.main in fresh interpreters and reports the median import
+# time, the time to build the OpenAPI schema from the routes and to load it
+# from a file made by "python -m backend.openapi". Fails (exit 1) when it
+# imports modules that are only needed later (password hashing, JWT backends,
+# the hashing process pool), or when the import (on top of a bare
+# "python -c pass") is over budget:
+#   - the reference run for this Python version in
+#     benchmarks/startup_reference.json (committed, one entry per X.Y), scaled
+#     by how much slower or faster the bare interpreter is on this machine,
+#     plus --tolerance
+#   - --budget-ms sets a fixed budget instead
+# Without a reference for the running Python version it fails as well: record
+# one with --save and commit it.
+#
+# usage:
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --runs 20 --tolerance 0.1 --top 10
+#   python -m benchmarks.bench_startup --runs 20 --save   # after an intended change
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_FILE = os.path.join(ROOT, "benchmarks", "startup_reference.json")
+PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+
+# modules a worker must not import before its first login/token
+HEAVY_MODULES = ("passlib.context", "bcrypt", "jose", "ecdsa", "rsa", "multiprocessing", "concurrent.futures.process")
+
+# runs in the fresh interpreter, prints its timings as JSON
+PROBE = """
+import json, time
+started = time.perf_counter()
+import backend.main
+imported = time.perf_counter()
+backend.main.app.openapi()
+print(json.dumps({"import_ms": (imported - started) * 1000, "openapi_ms": (time.perf_counter() - imported) * 1000}))
+"""
+
+
+def run_python(args: list, env: dict, cwd: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], env=env, cwd=cwd, text=True, **kwargs)
+
+
+def time_run(args: list, env: dict, cwd: str) -> float:
+    started = time.perf_counter()
+    run_python(args, env, cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def probe(env: dict, cwd: str, runs: int) -> dict:
+    # median of each timing over fresh interpreters
+    samples = [json.loads(run_python(["-c", PROBE], env, cwd, capture_output=True, check=True).stdout) for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def import_times(env: dict, cwd: str) -> dict:
+    # -X importtime: "import time: self | cumulative | module" per module on stderr
+    result = run_python(["-X", "importtime", "-c", "import backend.main"], env, cwd, capture_output=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative) / 1000
+    return times
+
+
+def load_references(path: str) -> dict:
+    # Python "X.Y" -> {"baseline_ms", "import_ms"}
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def import_budget(args, references: dict, baseline: float) -> tuple:
+    # (allowed ms on top of the bare interpreter or None, where it comes from)
+    if args.budget_ms is not None:
+        return args.budget_ms, "--budget-ms"
+    reference = references.get(PYTHON_VERSION)
+    if reference is None:
+        return None, f"no reference for Python {PYTHON_VERSION}"
+    scale = baseline / reference["baseline_ms"]   # this machine vs the reference one
+    return reference["import_ms"] * scale * (1 + args.tolerance), f"Python {PYTHON_VERSION} reference +{args.tolerance:.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API worker import/startup time")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fixed allowed import time on top of a bare interpreter")
+    parser.add_argument("--reference", default=REFERENCE_FILE, help="reference runs to compare with")
+    parser.add_argument("--save", action="store_true", help="store this run as the reference for this Python version")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the reference (0.25 = 25%%)")
+    parser.add_argument("--top", type=int, default=8, help="show the slowest top-level packages and backend modules")
+    args = parser.parse_args()
+
+    cwd = tempfile.mkdtemp(prefix="todo-startup-")
+    env = {**os.environ, "PYTHONPATH": ROOT, "TODO_DATABASE_URL": f"sqlite:///{os.path.join(cwd, 'database.db')}"}
+    env.pop("TODO_OPENAPI_FILE", None)
+
+    time_run(["-c", "import backend.main"], env, cwd)   # warm the OS file cache and .pyc files
+    baseline = statistics.median(time_run(["-c", "pass"], env, cwd) for _ in range(args.runs))
+    total = statistics.median(time_run(["-c", "import backend.main"], env, cwd) for _ in range(args.runs))
+    built = probe(env, cwd, args.runs)
+
+    schema_file = os.path.join(cwd, "openapi.json")
+    run_python(["-m", "backend.openapi", "--output", schema_file], env, cwd, stdout=subprocess.DEVNULL, check=True)
+    loaded = probe({**env, "TODO_OPENAPI_FILE": schema_file}, cwd, args.runs)
+
+    references = load_references(args.reference)
+    budget, budget_source = import_budget(args, references, baseline)
+    budget_text = f"budget {budget:.0f}: {budget_source}" if budget is not None else budget_source
+    print(f"{'python -c pass':<28} {baseline:8.1f} ms")
+    print(f"{'import backend.main':<28} {total:8.1f} ms  (+{total - baseline:.1f} ms, {budget_text})")
+    print(f"{'  in-process import':<28} {built['import_ms']:8.1f} ms")
+    print(f"{'  openapi built from routes':<28} {built['openapi_ms']:8.1f} ms")
+    print(f"{'  openapi from file':<28} {loaded['openapi_ms']:8.1f} ms")
+
+    times = import_times(env, cwd)
+    packages = {module: ms for module, ms in times.items() if "." not in module and module != "backend"}
+    backend_modules = {module: ms for module, ms in times.items() if module.startswith("backend.")}
+    for title, group in (("slowest packages", packages), ("slowest backend modules", backend_modules)):
+        print(f"\n{title} (cumulative):")
+        for module, ms in sorted(group.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {module:<36} {ms:7.1f} ms")
+
+    if args.save:
+        references[PYTHON_VERSION] = {"baseline_ms": round(baseline, 1), "import_ms": round(total - baseline, 1)}
+        with open(args.reference, "w") as file:
+            json.dump(references, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"\nsaved the Python {PYTHON_VERSION} reference to {args.reference}")
+
+    heavy = sorted(module for module in times if module in HEAVY_MODULES)
+    missing = not args.save and budget is None
+    over_budget = not args.save and budget is not None and total - baseline > budget
+    if heavy:
+        print(f"\nFAIL: imported at startup: {', '.join(heavy)}")
+    if missing:
+        print(f"\nFAIL: no reference run for Python {PYTHON_VERSION} in {args.reference}, record one with --save")
+    if over_budget:
+        print(f"\nFAIL: import is over budget by {total - baseline - budget:.1f} ms")
+    sys.exit(1 if heavy or missing or over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
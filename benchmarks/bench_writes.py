@@ -0,0 +1,169 @@
+# benchmarks/bench_writes.py
+#
+# Compares PUT /todos/{id} and DELETE /todos/{id} under concurrent load:
+#   read_modify_write   the previous crud code: session.get, ownership check in
+#                       Python, version bump, flush, commit, refresh
+#   single_statement    the current crud code: UPDATE/DELETE ... WHERE id AND
+#                       owner_id RETURNING, then the version bump
+#
+# Both variants run in the same process against the same seeded database,
+# each deletes its own todos. Runs in-process (ASGI transport, no network).
+# With TODO_DB_MODE=async the baseline can also fail with "database is locked":
+# its read transaction can not be upgraded to a write once another write
+# committed in between, a single write statement never hits that.
+#
+# usage (needs httpx):
+#   python -m benchmarks.bench_writes --users 10 --todos 1000 --concurrency 20
+#   TODO_DB_MODE=async python -m benchmarks.bench_writes
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional
+
+from benchmarks.bench_api import seed, summarize
+
+
+# ------------------------------
+# BASELINE (the crud functions before the single-statement rewrite)
+# ------------------------------
+def read_modify_write_update(session, owner_id: int, todo_id: int, changes: dict, if_match: Optional[set[int]] = None):
+    from backend.models import Todo, TodoRead
+    from backend.todo.crud import VersionMismatch, bump_todo_version, stamp_completion
+
+    todo = session.get(Todo, todo_id)
+    if not todo or todo.owner_id != owner_id:
+        return None
+    if if_match is not None and todo.version not in if_match:
+        raise VersionMismatch()
+
+    now = datetime.utcnow()
+    stamp_completion(todo.completed, changes, now)
+    for field, value in changes.items():
+        setattr(todo, field, value)
+    todo.version = bump_todo_version(session, owner_id)
+    todo.updated_at = now
+
+    session.add(todo)
+    session.commit()
+    session.refresh(todo)
+    return TodoRead.model_validate(todo)
+
+
+def read_modify_write_delete(session, owner_id: int, todo_id: int, if_match: Optional[set[int]] = None) -> bool:
+    from backend.models import Todo, TodoTombstone
+    from backend.todo.crud import VersionMismatch, bump_todo_version
+
+    todo = session.get(Todo, todo_id)
+    if not todo or todo.owner_id != owner_id:
+        return False
+    if if_match is not None and todo.version not in if_match:
+        raise VersionMismatch()
+
+    version = bump_todo_version(session, owner_id)
+    session.add(TodoTombstone(todo_id=todo.id, owner_id=owner_id, version=version))
+    session.delete(todo)
+    session.commit()
+    return True
+
+
+# ------------------------------
+# RUNNER
+# ------------------------------
+async def run_writes(client, method: str, jobs: list, concurrency: int) -> dict:
+    # jobs: (token, todo_id), each is sent once
+    latencies = []
+    errors = 0
+    pending = iter(enumerate(jobs))
+
+    async def worker():
+        nonlocal errors
+        for index, (token, todo_id) in pending:
+            kwargs = {"json": {"completed": index % 2 == 0}} if method == "PUT" else {}
+            started = time.perf_counter()
+            response = await client.request(
+                method, f"/todos/{todo_id}", headers={"Authorization": f"Bearer {token}"}, **kwargs
+            )
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args, accounts: list) -> dict:
+    import httpx
+
+    from backend.auth.hashing import shutdown_hash_pool
+    from backend.main import app
+    from backend.todo import crud
+
+    variants = {
+        "read_modify_write": (read_modify_write_update, read_modify_write_delete),
+        "single_statement": (crud.update_todo, crud.delete_todo),
+    }
+
+    # every variant updates random todos, then deletes its own share of them
+    shares = {name: [] for name in variants}
+    for account in accounts:
+        ids = list(account["todo_ids"])
+        random.shuffle(ids)
+        for offset, name in enumerate(variants):
+            shares[name] += [(account["token"], todo_id) for todo_id in ids[offset::len(variants)]]
+
+    results = {}
+    # a failed write (e.g. "database is locked") counts as an error instead of stopping the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, (update_fn, delete_fn) in variants.items():
+                crud.update_todo, crud.delete_todo = update_fn, delete_fn
+                jobs = shares[name]
+                updates = [random.choice(jobs) for _ in range(args.requests)]
+                await run_writes(client, "PUT", updates[:args.warmup], args.concurrency)
+                results[f"update {name}"] = await run_writes(client, "PUT", updates, args.concurrency)
+                results[f"delete {name}"] = await run_writes(client, "DELETE", jobs[:args.requests], args.concurrency)
+    finally:
+        crud.update_todo, crud.delete_todo = variants["single_statement"]
+        shutdown_hash_pool()
+
+    for operation in ("update", "delete"):
+        report(operation, results[f"{operation} read_modify_write"], results[f"{operation} single_statement"])
+    return results
+
+
+def report(operation: str, before: dict, after: dict):
+    speedup = before["p50_ms"] / after["p50_ms"] if after["p50_ms"] else 0.0
+    print(f"{operation:<7} read_modify_write p50 {before['p50_ms']:>7} ms p95 {before['p95_ms']:>7} ms {before['rps']:>8} rps"
+          f" | single_statement p50 {after['p50_ms']:>7} ms p95 {after['p95_ms']:>7} ms {after['rps']:>8} rps | x{speedup:.2f}"
+          f" | errors {before['errors']}/{after['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="read-modify-write vs single-statement todo writes")
+    parser.add_argument("--users", type=int, default=10, help="users to seed")
+    parser.add_argument("--todos", type=int, default=1000, help="todos to seed per user")
+    parser.add_argument("--requests", type=int, default=1000, help="measured updates and deletes per variant")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured updates first")
+    args = parser.parse_args()
+    if args.requests > args.users * args.todos // 2:
+        parser.error("--requests must be at most half of --users x --todos (each variant deletes its own todos)")
+
+    # the backend reads its settings at import time, so set them first
+    database = os.path.join(tempfile.mkdtemp(prefix="todo-bench-"), "database.db")
+    os.environ["TODO_DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("TODO_RATE_LIMIT_ENABLED", "false")   # measure the app, not the limiter
+
+    print(f"seeding {args.users} users x {args.todos} todos into {database}")
+    accounts = seed(args.users, args.todos)["accounts"]
+    asyncio.run(run(args, accounts))
+
+
+if __name__ == "__main__":
+    main()
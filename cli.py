@@ -1,6 +1,9 @@
 import argparse     # for reading command line arguments
-import requests     # to send HTTP requests to our FastAPI app
 import os           # to check if token file exists
+import sys          # batch reads stdin, errors go to stderr
+
+# heavier modules (requests, json, concurrent.futures) are imported inside the
+# functions that use them, so quick commands like logout start fast
 
 # ----------------------------
 # LOAD TOKEN FUNCTION - helps the CLI "remember" the user
@@ -28,7 +31,7 @@ def save_token(token: str):
     """Save token to a local file."""
     with open(TOKEN_FILE, "w") as file:
         file.write(token)
-    print("Token saved to token.txt")
+    info("Token saved to token.txt")
 
 
 def load_token() -> str:
@@ -36,10 +39,10 @@ def load_token() -> str:
     if os.path.exists(TOKEN_FILE):
         with open(TOKEN_FILE, "r") as file:
             token = file.read().strip()
-            print("Loaded saved token from token.txt")
+            info("Loaded saved token from token.txt")
             return token
     else:
-        print("No saved token found. Please login first.")
+        fail("No saved token found. Please login first.")
         return None
     
 
@@ -49,6 +52,97 @@ def load_token() -> str:
 BASE_URL = "http://127.0.0.1:8003"   # the port where FastAPI server is running
 
 
+# ----------------------------
+# OUTPUT MODE - set by --quiet / --json
+#   text   progress messages and readable results (default)
+#   quiet  only the essentials (ids, one todo per line)
+#   json   the server's JSON response, one document per command
+# errors always go to stderr outside text mode and make the exit code 1
+# ----------------------------
+OUTPUT = "text"
+EXIT_CODE = 0
+
+def info(*args):
+    # progress messages and readable results
+    if OUTPUT == "text":
+        print(*args)
+
+
+def lean(*args):
+    # short output for --quiet
+    if OUTPUT == "quiet":
+        print(*args)
+
+
+def emit_json(data):
+    # machine readable output for --json
+    if OUTPUT == "json":
+        import json
+        print(json.dumps(data))
+
+
+def fail(message: str, details: str = None):
+    global EXIT_CODE
+    EXIT_CODE = 1
+    if OUTPUT == "text":
+        print(message)
+        if details is not None:
+            print("Details:", details)
+    else:
+        print(message if details is None else f"{message}: {details}", file=sys.stderr)
+
+
+# ----------------------------
+# HTTP SESSION - one keep-alive connection pool per CLI run
+# every command goes through http(), so repeated requests (list pages,
+# batch operations) reuse TCP connections instead of reconnecting
+# ----------------------------
+MAX_CONNECTIONS = 32   # upper bound for batch --workers
+
+_http = None
+
+def http():
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import make_headers   # installed with requests
+
+        _http = requests.Session()
+        # ask for compressed responses, requests decompresses them for us
+        # (gzip, deflate, plus br/zstd when brotli/zstandard are installed)
+        _http.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONNECTIONS)
+        _http.mount("http://", adapter)
+        _http.mount("https://", adapter)
+    return _http
+
+
+# ----------------------------
+# RATE LIMITS - the server answers 429 with Retry-After (seconds) when a user
+# sends too much; paging and batch requests wait and retry a few times
+# ----------------------------
+MAX_RETRIES = 8
+MAX_RETRY_WAIT = 60   # seconds, longer waits are cut to this
+
+def retry_after(response) -> float:
+    try:
+        wait = float(response.headers.get("Retry-After", 1))
+    except ValueError:
+        wait = 1.0
+    return min(max(wait, 0.1), MAX_RETRY_WAIT)
+
+
+def send(method: str, url: str, **kwargs):
+    import time
+
+    for attempt in range(MAX_RETRIES + 1):
+        response = http().request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            return response
+        time.sleep(retry_after(response))
+
+
 # ----------------------------
 # SIGNUP FUNCTION
 # ----------------------------
@@ -66,18 +160,18 @@ def signup(username: str, password: str):
     }
 
     # make a POST request to the signup endpoint
-    response = requests.post(url, json=payload)
-    print(f"Sending signup request to: {url}")
-    print("Payload:", payload)
+    response = http().post(url, json=payload)
+    info(f"Sending signup request to: {url}")
+    info("Payload:", payload)
 
 
     # check server response
     if response.status_code == 200:
-        print("Signup successful!")
-        print("Response from server:", response.json())   # show token or message
+        info("Signup successful!")
+        info("Response from server:", response.json())   # show token or message
+        emit_json(response.json())
     else:
-        print(f"Signup failed ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Signup failed ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -97,9 +191,9 @@ def login(username: str, password: str):
     }
 
     # send POST request
-    print(f"Sending login request to: {url}")
-    print("Payload:", payload)
-    response = requests.post(url, data=payload)
+    info(f"Sending login request to: {url}")
+    info("Payload:", payload)
+    response = http().post(url, data=payload)
 
     # check server response
     if response.status_code == 200:
@@ -108,21 +202,21 @@ def login(username: str, password: str):
         #get token from the response
         token = data.get("access_token")
 
-        print("Login successful!")
-        print("Access token:", data.get("access_token"))
-        print("Token type:", data.get("token_type"))
+        info("Login successful!")
+        info("Access token:", data.get("access_token"))
+        info("Token type:", data.get("token_type"))
+        emit_json(data)
 
         # SAVE TOKEN TO FILE
         try:
             with open("token.txt", "w") as file:
                 file.write(token)
-            print("Token saved to token.txt")
+            info("Token saved to token.txt")
         except Exception as e:
-            print("Could not save token:", e)
+            fail("Could not save token", str(e))
     
     else:
-        print(f"Login failed ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Login failed ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -149,17 +243,18 @@ def add_todo(title: str, description: str):
     }
 
     # send POST request to backend
-    print(f"Sending request to: {url}")
-    print("Payload:", payload)
-    response = requests.post(url, json=payload, headers=headers)
+    info(f"Sending request to: {url}")
+    info("Payload:", payload)
+    response = http().post(url, json=payload, headers=headers)
 
     # check response
     if response.status_code == 200:
-        print("Todo created successfully!")
-        print("Response:", response.json())
+        info("Todo created successfully!")
+        info("Response:", response.json())
+        lean(response.json()["id"])
+        emit_json(response.json())
     else:
-        print(f"Failed to create todo ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Failed to create todo ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -167,6 +262,8 @@ def add_todo(title: str, description: str):
 # ----------------------------
 # This function fetches all todos for the currently logged-in user.
 # It uses the saved token from token.txt for authentication.
+PAGE_SIZE = 1000   # server's MAX_PAGE_SIZE
+
 def list_todos():
     # load saved token
     token = load_token()
@@ -181,18 +278,33 @@ def list_todos():
         "Authorization": f"Bearer {token}"
     }
 
-    # send GET request to backend
-    print(f"Sending request to: {url}")
-    response = requests.get(url, headers=headers)
+    # send GET requests to backend, following the next page cursor
+    # (largest pages the server allows, so big lists stay within the rate limit)
+    info(f"Sending request to: {url}")
+    todos = []
+    params = {"limit": PAGE_SIZE}
+    while True:
+        response = send("GET", url, headers=headers, params=params)
+        if response.status_code != 200:
+            break
+        todos.extend(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": PAGE_SIZE, "cursor": next_cursor}
 
     # check response
     if response.status_code == 200:
-        todos = response.json()
-        print("Todos fetched successfully!")
-        print("------------------------------------")
+        emit_json(todos)
+        # quiet: one tab separated line per todo (id, completed, title)
+        for todo in todos:
+            lean(f"{todo['id']}\t{int(todo['completed'])}\t{todo['title']}")
+
+        info("Todos fetched successfully!")
+        info("------------------------------------")
         if not todos:
-            print("You have no todos yet.")
-        else:
+            info("You have no todos yet.")
+        elif OUTPUT == "text":
             for todo in todos:
                 print(f"ID: {todo['id']}")
                 print(f"Title: {todo['title']}")
@@ -201,8 +313,7 @@ def list_todos():
                 print(f"Created at: {todo['created_at']}")
                 print("------------------------------------")
     else:
-        print(f"Failed to fetch todos ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Failed to fetch todos ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -228,7 +339,7 @@ def update_todo(todo_id: int, title: str = None, description: str = None, comple
         payload["completed"] = completed
 
     if not payload:
-        print("No fields provided to update.")
+        fail("No fields provided to update.")
         return
 
     # attach authorization header
@@ -237,17 +348,17 @@ def update_todo(todo_id: int, title: str = None, description: str = None, comple
     }
 
     # send PUT request
-    print(f"Sending update request to: {url}")
-    print("Payload:", payload)
-    response = requests.put(url, json=payload, headers=headers)
+    info(f"Sending update request to: {url}")
+    info("Payload:", payload)
+    response = http().put(url, json=payload, headers=headers)
 
     # check response
     if response.status_code == 200:
-        print("Todo updated successfully!")
-        print("Response:", response.json())
+        info("Todo updated successfully!")
+        info("Response:", response.json())
+        emit_json(response.json())
     else:
-        print(f"Failed to update todo ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Failed to update todo ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -269,16 +380,16 @@ def delete_todo(todo_id: int):
     }
 
     # send DELETE request
-    print(f"Sending delete request to: {url}")
-    response = requests.delete(url, headers=headers)
+    info(f"Sending delete request to: {url}")
+    response = http().delete(url, headers=headers)
 
     # check response
     if response.status_code == 200:
-        print("Todo deleted successfully!")
-        print("Response:", response.json())
+        info("Todo deleted successfully!")
+        info("Response:", response.json())
+        emit_json(response.json())
     else:
-        print(f"Failed to delete todo ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Failed to delete todo ({response.status_code})", response.text)
 
 
 # ----------------------------
@@ -288,9 +399,10 @@ def delete_todo(todo_id: int):
 def logout():
     if os.path.exists(TOKEN_FILE):
         os.remove(TOKEN_FILE)
-        print("Logged out successfully. Token file deleted.")
+        info("Logged out successfully. Token file deleted.")
     else:
-        print("No token file found. You are already logged out.")
+        info("No token file found. You are already logged out.")
+    emit_json({"logged_out": True})
 
 
 # ----------------------------
@@ -312,18 +424,196 @@ def whoami():
     }
 
     # send GET request
-    print(f"Sending request to: {url}")
-    response = requests.get(url, headers=headers)
+    info(f"Sending request to: {url}")
+    response = http().get(url, headers=headers)
 
     # check response
     if response.status_code == 200:
         user = response.json()
-        print("Current logged-in user:")
-        print(f"Username: {user['username']}")
-        print(f"Created at: {user['created_at']}")
+        info("Current logged-in user:")
+        info(f"Username: {user['username']}")
+        info(f"Created at: {user['created_at']}")
+        lean(user["username"])
+        emit_json(user)
     else:
-        print(f"Failed to fetch user info ({response.status_code})")
-        print("Details:", response.text)
+        fail(f"Failed to fetch user info ({response.status_code})", response.text)
+
+
+# ----------------------------
+# BATCH FUNCTION
+# ----------------------------
+# Runs many operations from a JSON lines file (or stdin), one per line:
+#   {"op": "add", "title": "Buy milk", "description": "2 litres"}
+#   {"op": "update", "id": 3, "completed": true}
+#   {"op": "delete", "id": 4}
+# mode "bulk" sends consecutive lines with the same op to the bulk endpoints,
+# mode "parallel" sends one request per line from a pool of worker threads
+# (lines may then finish in any order), "auto" uses bulk when the server has it.
+BULK_CHUNK_SIZE = 5000      # server's MAX_BULK_ITEMS
+MAX_FAILURES_SHOWN = 20
+UPDATE_FIELDS = ("title", "description", "completed")
+
+
+def read_batch(source: str):
+    # returns (valid operations, failures) - each operation is (line number, dict)
+    import json
+
+    operations, failures = [], []
+    file = sys.stdin if source == "-" else open(source, "r")
+    try:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                failures.append((line_number, "?", f"invalid JSON: {e.msg}"))
+                continue
+            op = item.get("op") if isinstance(item, dict) else None
+            if op == "add" and item.get("title"):
+                operations.append((line_number, item))
+            elif op in ("update", "delete") and isinstance(item.get("id"), int):
+                operations.append((line_number, item))
+            else:
+                failures.append((line_number, op or "?", "needs op add (with title) or update/delete (with id)"))
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return operations, failures
+
+
+def send_one(item: dict, headers: dict):
+    # one request for one operation, returns an error message or None
+    op = item["op"]
+    if op == "add":
+        payload = {"title": item["title"], "description": item.get("description", "")}
+        response = send("POST", f"{BASE_URL}/todos/", json=payload, headers=headers)
+    elif op == "update":
+        payload = {field: item[field] for field in UPDATE_FIELDS if field in item}
+        response = send("PUT", f"{BASE_URL}/todos/{item['id']}", json=payload, headers=headers)
+    else:
+        response = send("DELETE", f"{BASE_URL}/todos/{item['id']}", headers=headers)
+    if response.status_code == 200:
+        return None
+    return f"{response.status_code} {response.text}"
+
+
+def run_parallel(operations: list, headers: dict, workers: int) -> list:
+    from concurrent.futures import ThreadPoolExecutor
+    import requests
+
+    def run(operation):
+        line_number, item = operation
+        try:
+            return line_number, item["op"], send_one(item, headers)
+        except requests.RequestException as e:
+            return line_number, item["op"], str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, operations))
+
+
+def send_bulk(op: str, chunk: list, headers: dict):
+    # one bulk request for up to BULK_CHUNK_SIZE operations of the same kind
+    items = [item for _, item in chunk]
+    if op == "add":
+        payload = [{"title": item["title"], "description": item.get("description", "")} for item in items]
+        return send("POST", f"{BASE_URL}/todos/bulk", json=payload, headers=headers)
+    if op == "update":
+        payload = [{"id": item["id"], **{field: item[field] for field in UPDATE_FIELDS if field in item}} for item in items]
+        return send("PATCH", f"{BASE_URL}/todos/bulk", json=payload, headers=headers)
+    return send("DELETE", f"{BASE_URL}/todos/bulk", json={"ids": [item["id"] for item in items]}, headers=headers)
+
+
+def run_bulk(operations: list, headers: dict):
+    # returns None if the server has no bulk endpoints
+    from itertools import groupby
+
+    results = []
+    # keep the file order: consecutive lines with the same op form one group
+    for op, group in groupby(operations, key=lambda operation: operation[1]["op"]):
+        group = list(group)
+        for start in range(0, len(group), BULK_CHUNK_SIZE):
+            chunk = group[start:start + BULK_CHUNK_SIZE]
+            response = send_bulk(op, chunk, headers)
+            if response.status_code in (404, 405) and not results:
+                return None
+            if response.status_code != 200:
+                results.extend((line_number, op, f"{response.status_code} {response.text}") for line_number, _ in chunk)
+                continue
+            for result in response.json():
+                line_number = chunk[result["index"]][0]
+                ok = result["status"] in ("created", "updated", "deleted")
+                results.append((line_number, op, None if ok else result["status"]))
+    return results
+
+
+def batch(source: str, workers: int, mode: str):
+    import time
+
+    token = load_token()
+    if not token:
+        return
+
+    headers = {
+        "Authorization": f"Bearer {token}"
+    }
+
+    operations, failures = read_batch(source)
+    info(f"Read {len(operations)} operations ({len(failures)} invalid lines)")
+
+    started = time.perf_counter()
+    results = None
+    used = mode
+    if mode in ("auto", "bulk"):
+        results = run_bulk(operations, headers)
+        used = "bulk"
+        if results is None:
+            if mode == "bulk":
+                fail("Server has no bulk endpoints, use --mode parallel")
+                return
+            info("Server has no bulk endpoints, falling back to parallel requests")
+    if results is None:
+        results = run_parallel(operations, headers, workers)
+        used = f"parallel x{workers}"
+    elapsed = time.perf_counter() - started
+
+    results.extend(failures)
+    summary = {}
+    for _, op, error in results:
+        counts = summary.setdefault(op, [0, 0])
+        counts[0 if error is None else 1] += 1
+    failed = sorted((line_number, op, error) for line_number, op, error in results if error is not None)
+
+    if failed:
+        global EXIT_CODE
+        EXIT_CODE = 1
+
+    emit_json({
+        "mode": used,
+        "ok": len(results) - len(failed),
+        "failed": len(failed),
+        "seconds": round(elapsed, 3),
+        "ops": {op: {"ok": ok, "failed": bad} for op, (ok, bad) in summary.items()},
+        "failures": [{"line": line_number, "op": op, "error": error} for line_number, op, error in failed],
+    })
+    lean(f"{len(results) - len(failed)} ok, {len(failed)} failed")
+    for line_number, op, error in failed[:MAX_FAILURES_SHOWN]:
+        if OUTPUT == "quiet":
+            print(f"line {line_number} ({op}): {error}", file=sys.stderr)
+
+    # print summary
+    info("------------------------------------")
+    info(f"Batch finished ({used}): {len(results) - len(failed)} ok, {len(failed)} failed "
+         f"in {elapsed:.2f}s ({len(operations) / elapsed if elapsed else 0:.0f} ops/s)")
+    for op, (ok, bad) in sorted(summary.items()):
+        info(f"  {op}: {ok} ok, {bad} failed")
+    if failed:
+        info("Failures:")
+        for line_number, op, error in failed[:MAX_FAILURES_SHOWN]:
+            info(f"  line {line_number} ({op}): {error}")
+        if len(failed) > MAX_FAILURES_SHOWN:
+            info(f"  ... and {len(failed) - MAX_FAILURES_SHOWN} more")
 
 
 # ----------------------------
@@ -333,6 +623,11 @@ def main():
     # Create argument parser for CLI commands
     parser = argparse.ArgumentParser(description="Todo API CLI Tool")
 
+    # output mode for scripts (goes before the command: python cli.py --json list-todos)
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument("--quiet", "-q", action="store_true", help="Only print ids / one todo per line")
+    output_group.add_argument("--json", action="store_true", help="Print the server response as JSON")
+
     # create sub-commands (like signup, login, etc.)
     subparsers = parser.add_subparsers(dest="command")
 
@@ -378,9 +673,21 @@ def main():
     # This command shows details of the currently logged-in user using their saved token.
     subparsers.add_parser("whoami", help="Show details of the current logged-in user")
 
+    # --- batch command ---
+    # This command runs many add/update/delete operations from a JSON lines file (or stdin).
+    batch_parser = subparsers.add_parser("batch", help="Run many operations from a JSON lines file or stdin")
+    batch_parser.add_argument("file", nargs="?", default="-", help="JSON lines file, - for stdin (default)")
+    batch_parser.add_argument("--workers", type=int, default=8, choices=range(1, MAX_CONNECTIONS + 1), metavar="N",
+                              help=f"concurrent requests in parallel mode (1-{MAX_CONNECTIONS}, default 8)")
+    batch_parser.add_argument("--mode", choices=["auto", "bulk", "parallel"], default="auto",
+                              help="bulk endpoints, parallel single requests, or bulk when available (default)")
+
     # parse the entered command
     args = parser.parse_args()
 
+    global OUTPUT
+    OUTPUT = "json" if args.json else "quiet" if args.quiet else "text"
+
     # run the function based on the command entered
     if args.command == "signup":
         signup(args.username, args.password)
@@ -398,9 +705,13 @@ def main():
         logout()
     elif args.command == "whoami":
         whoami()
+    elif args.command == "batch":
+        batch(args.file, args.workers, args.mode)
     else:
         parser.print_help()
 
+    sys.exit(EXIT_CODE)
+
 
 # ----------------------------
 # PROGRAM ENTRY POINT
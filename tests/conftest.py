@@ -0,0 +1,64 @@
+# tests/conftest.py
+
+# the backend reads its settings at import time, so they are set before any
+# backend import: a throwaway sqlite file, cheap bcrypt in the threadpool and
+# no rate limits. TODO_DB_MODE and TODO_RESPONSE_CACHE_BACKEND can be set
+# from outside to run the suite against the other modes.
+
+import os
+import sqlite3
+import tempfile
+import uuid
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="todo-tests-")
+DATABASE_PATH = os.path.join(DATA_DIR, "database.db")
+
+os.environ["TODO_DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ.pop("TODO_ASYNC_DATABASE_URL", None)
+os.environ["TODO_RESPONSE_CACHE_SQLITE_PATH"] = os.path.join(DATA_DIR, "response_cache.db")
+os.environ["TODO_RATE_LIMIT_SQLITE_PATH"] = os.path.join(DATA_DIR, "ratelimit.db")
+os.environ["TODO_RATE_LIMIT_ENABLED"] = "false"
+os.environ.setdefault("TODO_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("TODO_HASH_WORKERS", "0")
+os.environ.setdefault("TODO_RESPONSE_CACHE_BACKEND", "memory")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # runs the startup hooks (tables, search index) once for the whole suite
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def signup(client) -> dict:
+    username = f"user-{uuid.uuid4().hex[:12]}"
+    client.post("/auth/signup", json={"username": username, "password": "secret"})
+    token = client.post("/auth/token", data={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def auth(client) -> dict:
+    # a fresh user per test: every todo is owner scoped, so tests sharing the
+    # database never see each other's data
+    return signup(client)
+
+
+@pytest.fixture
+def other_auth(client) -> dict:
+    return signup(client)
+
+
+@pytest.fixture
+def execute_sql():
+    # raw writes behind the app's back, e.g. to fake rows from an older schema
+    def execute(statement: str, parameters: tuple = ()):
+        with sqlite3.connect(DATABASE_PATH) as conn:
+            conn.execute(statement, parameters)
+    return execute
@@ -0,0 +1,29 @@
+# tests/helpers.py
+
+# client-side helpers shared by the test modules
+
+
+def create_todos(client, auth: dict, count: int) -> list[int]:
+    response = client.post("/todos/bulk", json=[{"title": f"todo {n}"} for n in range(count)], headers=auth)
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+
+def sync(client, auth: dict, since: int = 0, limit: int = 1000) -> tuple:
+    # follows has_more/next like a client would:
+    # (final cursor, {id: todo} of changed todos, deleted ids, pages)
+    changed, deleted, pages = {}, set(), 0
+    params = {"since": since, "limit": limit}
+    while True:
+        response = client.get("/todos/changes", params=params, headers=auth)
+        assert response.status_code == 200
+        body = response.json()
+        pages += 1
+        assert len(body["changed"]) + len(body["deleted"]) <= limit
+        for todo in body["changed"]:
+            changed[todo["id"]] = todo
+        deleted |= {tombstone["id"] for tombstone in body["deleted"]}
+        if not body["has_more"]:
+            assert body["next"] is None
+            return body["cursor"], changed, deleted, pages
+        params = {"after": body["next"], "limit": limit}
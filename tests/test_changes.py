@@ -0,0 +1,91 @@
+# tests/test_changes.py
+
+# GET /todos/changes: pages in (version, kind, id) order, continues inside a
+# version with the "next" cursor, since=0 is a full snapshot
+
+import pytest
+
+from tests.helpers import create_todos, sync
+
+
+def test_first_sync_returns_every_todo(client, auth):
+    ids = create_todos(client, auth, 3)
+    cursor, changed, deleted, _ = sync(client, auth)
+    assert sorted(changed) == sorted(ids)
+    assert deleted == set()
+    assert sync(client, auth, since=cursor)[1:3] == ({}, set())
+
+
+def test_since_zero_includes_todos_from_before_versions(client, auth, execute_sql):
+    # todos written before the version column existed were migrated with version 0
+    ids = create_todos(client, auth, 4)
+    execute_sql(f"UPDATE todo SET version = 0 WHERE id IN ({', '.join('?' * 3)})", tuple(ids[:3]))
+
+    cursor, changed, _, _ = sync(client, auth, since=0, limit=2)
+    assert sorted(changed) == sorted(ids)
+    assert [changed[todo_id]["version"] for todo_id in ids[:3]] == [0, 0, 0]
+    assert sync(client, auth, since=cursor)[1] == {}
+
+
+def test_a_bulk_version_is_split_across_pages(client, auth):
+    ids = create_todos(client, auth, 12)   # one version for all of them
+
+    cursor, changed, _, pages = sync(client, auth, limit=5)
+    assert pages == 3
+    assert sorted(changed) == sorted(ids)
+    assert {todo["version"] for todo in changed.values()} == {cursor}
+
+
+def test_pages_match_a_single_response(client, auth):
+    ids = create_todos(client, auth, 10)
+    client.put(f"/todos/{ids[0]}", json={"completed": True}, headers=auth)
+    client.delete(f"/todos/{ids[1]}", headers=auth)
+    client.request("DELETE", "/todos/bulk", json={"ids": ids[2:4]}, headers=auth)
+
+    whole = sync(client, auth)
+    paged = sync(client, auth, limit=3)
+    assert whole[:3] == paged[:3]
+    assert whole[2] == set(ids[1:4])
+    assert sorted(whole[1]) == sorted(ids[:1] + ids[4:])
+
+
+def test_writes_between_pages_are_not_lost(client, auth):
+    ids = create_todos(client, auth, 8)
+    first = client.get("/todos/changes", params={"limit": 3}, headers=auth).json()
+    assert first["has_more"]
+    seen = {todo["id"] for todo in first["changed"]}
+
+    # change a todo that was already sent and delete one that was not
+    updated = next(iter(seen))
+    removed = next(todo_id for todo_id in ids if todo_id not in seen)
+    client.put(f"/todos/{updated}", json={"title": "changed"}, headers=auth)
+    client.delete(f"/todos/{removed}", headers=auth)
+
+    params = {"after": first["next"], "limit": 3}
+    changed, deleted = {}, set()
+    while True:
+        body = client.get("/todos/changes", params=params, headers=auth).json()
+        changed.update({todo["id"]: todo for todo in body["changed"]})
+        deleted |= {tombstone["id"] for tombstone in body["deleted"]}
+        if not body["has_more"]:
+            break
+        params["after"] = body["next"]
+
+    assert changed[updated]["title"] == "changed"
+    assert removed in deleted
+    assert sync(client, auth, since=body["cursor"])[1:3] == ({}, set())
+
+
+def test_changes_are_owner_scoped(client, auth, other_auth):
+    create_todos(client, auth, 2)
+    assert sync(client, other_auth)[1:3] == ({}, set())
+
+
+@pytest.mark.parametrize("params, status", [
+    ({"after": "not-a-cursor"}, 400),
+    ({"since": 10_000}, 400),
+    ({"limit": 0}, 422),
+    ({"limit": 1_000_000}, 422),
+])
+def test_bad_requests_are_rejected(client, auth, params, status):
+    assert client.get("/todos/changes", params=params, headers=auth).status_code == status
@@ -0,0 +1,123 @@
+# tests/test_response_cache.py
+
+# response cache invariants: a write drops the user's lists and the todos it
+# changed, and a response built before a write finished is never stored
+
+import pytest
+
+from backend.response_cache import CachedResponse, MemoryBackend, SQLiteBackend, response_cache
+
+from tests.helpers import create_todos, sync
+
+USER, OTHER_USER = 1, 2
+RESPONSE = CachedResponse(b"[]", {"ETag": '"1.1"'})
+
+
+# ------------------------------
+# BACKENDS
+# ------------------------------
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_bytes=1 << 20, ttl_seconds=60)
+    return SQLiteBackend(str(tmp_path / "cache.db"), max_bytes=1 << 20, ttl_seconds=60)
+
+
+def test_entries_are_served_until_invalidated(backend):
+    _, generation = backend.get(USER, "list:a")
+    backend.set(USER, "list:a", RESPONSE, generation, scoped=True)
+    assert backend.get(USER, "list:a")[0] == RESPONSE
+
+    backend.invalidate(USER, [])
+    assert backend.get(USER, "list:a")[0] is None
+
+
+def test_invalidate_drops_lists_and_the_named_todos_only(backend):
+    _, generation = backend.get(USER, "list:a")
+    for key, scoped in (("list:a", True), ("todo:1", False), ("todo:2", False)):
+        backend.set(USER, key, RESPONSE, generation, scoped=scoped)
+    _, other_generation = backend.get(OTHER_USER, "list:a")
+    backend.set(OTHER_USER, "list:a", RESPONSE, other_generation, scoped=True)
+
+    backend.invalidate(USER, ["todo:1"])
+    assert backend.get(USER, "list:a")[0] is None
+    assert backend.get(USER, "todo:1")[0] is None
+    assert backend.get(USER, "todo:2")[0] == RESPONSE
+    assert backend.get(OTHER_USER, "list:a")[0] == RESPONSE
+
+
+def test_response_read_before_a_write_is_not_stored(backend):
+    # a slow read takes its generation, a write commits and invalidates, then
+    # the read finishes: storing it would undo the write
+    _, generation = backend.get(USER, "todo:1")
+    backend.invalidate(USER, ["todo:1"])
+    backend.set(USER, "todo:1", RESPONSE, generation, scoped=False)
+    assert backend.get(USER, "todo:1")[0] is None
+
+    _, generation = backend.get(USER, "todo:1")
+    backend.set(USER, "todo:1", RESPONSE, generation, scoped=False)
+    assert backend.get(USER, "todo:1")[0] == RESPONSE
+
+
+# ------------------------------
+# ROUTES (cached reads always agree with the uncached changes feed)
+# ------------------------------
+needs_cache = pytest.mark.skipif(not response_cache.enabled, reason="TODO_RESPONSE_CACHE_BACKEND=off")
+
+
+def queries(response) -> int:
+    # Server-Timing: app;dur=.., db;dur=..;desc="N queries"
+    return int(response.headers["server-timing"].split('desc="')[1].split()[0])
+
+
+def warm(client, auth: dict, ids: list[int]):
+    for _ in range(2):
+        client.get("/todos/", params={"limit": 100}, headers=auth)
+        for todo_id in ids:
+            client.get(f"/todos/{todo_id}", headers=auth)
+
+
+WRITES = {
+    "create": lambda client, auth, ids: client.post("/todos/", json={"title": "new"}, headers=auth),
+    "update": lambda client, auth, ids: client.put(f"/todos/{ids[0]}", json={"title": "changed"}, headers=auth),
+    "delete": lambda client, auth, ids: client.delete(f"/todos/{ids[0]}", headers=auth),
+    "bulk_create": lambda client, auth, ids: client.post("/todos/bulk", json=[{"title": "bulk"}], headers=auth),
+    "bulk_update": lambda client, auth, ids: client.patch(
+        "/todos/bulk", json=[{"id": ids[0], "title": "a"}, {"id": ids[1], "completed": True}], headers=auth
+    ),
+    "bulk_delete": lambda client, auth, ids: client.request("DELETE", "/todos/bulk", json={"ids": ids[:2]}, headers=auth),
+    "import": lambda client, auth, ids: client.post("/todos/import", content=b'{"title": "imported"}\n', headers=auth),
+}
+
+
+@needs_cache
+def test_repeated_reads_skip_the_database(client, auth):
+    [todo_id] = create_todos(client, auth, 1)
+    warm(client, auth, [todo_id])
+    assert queries(client.get("/todos/", params={"limit": 100}, headers=auth)) == 0
+    assert queries(client.get(f"/todos/{todo_id}", headers=auth)) == 0
+
+
+@needs_cache
+@pytest.mark.parametrize("write", list(WRITES))
+def test_writes_invalidate_cached_reads(client, auth, write):
+    ids = create_todos(client, auth, 3)
+    warm(client, auth, ids)
+
+    assert WRITES[write](client, auth, ids).status_code == 200
+    _, expected, deleted, _ = sync(client, auth)   # not cached
+
+    listed = client.get("/todos/", params={"limit": 100}, headers=auth).json()
+    assert {todo["id"]: todo for todo in listed} == expected
+    for todo_id, todo in expected.items():
+        assert client.get(f"/todos/{todo_id}", headers=auth).json() == todo
+    for todo_id in deleted:
+        assert client.get(f"/todos/{todo_id}", headers=auth).status_code == 404
+
+
+@needs_cache
+def test_cached_todos_are_owner_scoped(client, auth, other_auth):
+    [todo_id] = create_todos(client, auth, 1)
+    warm(client, auth, [todo_id])
+    assert client.get(f"/todos/{todo_id}", headers=other_auth).status_code == 404
+    assert client.get("/todos/", params={"limit": 100}, headers=other_auth).json() == []
@@ -0,0 +1,77 @@
+# tests/test_writes.py
+
+# single-statement PUT/DELETE /todos/{id}: ownership and If-Match are part of
+# the UPDATE/DELETE itself, 404 and 412 cost no version
+
+import pytest
+
+from tests.helpers import create_todos, sync
+
+
+def etag(todo_id: int, version: int) -> str:
+    return f'"{todo_id}.{version}"'
+
+
+def collection_version(client, auth: dict) -> int:
+    return sync(client, auth)[0]
+
+
+def test_update_bumps_the_version_and_the_etag(client, auth):
+    [todo_id] = create_todos(client, auth, 1)
+    before = collection_version(client, auth)
+
+    response = client.put(f"/todos/{todo_id}", json={"title": "changed", "completed": True}, headers=auth)
+    assert response.status_code == 200
+    todo = response.json()
+    assert todo["title"] == "changed" and todo["completed_at"] is not None
+    assert todo["version"] == before + 1 == collection_version(client, auth)
+    assert response.headers["etag"] == etag(todo_id, todo["version"])
+
+
+def test_empty_update_writes_nothing(client, auth):
+    [todo_id] = create_todos(client, auth, 1)
+    before = client.get(f"/todos/{todo_id}", headers=auth)
+    version = collection_version(client, auth)
+
+    response = client.put(f"/todos/{todo_id}", json={}, headers=auth)
+    assert response.status_code == 200
+    assert response.json() == before.json()
+    assert response.headers["etag"] == before.headers["etag"]
+    assert collection_version(client, auth) == version
+
+
+@pytest.mark.parametrize("method, body", [("PUT", {"title": "x"}), ("PUT", {}), ("DELETE", None)])
+def test_if_match_tells_stale_from_missing(client, auth, other_auth, method, body):
+    [todo_id] = create_todos(client, auth, 1)
+    version = collection_version(client, auth)
+
+    def send(todo: int, headers: dict, tag: str):
+        return client.request(method, f"/todos/{todo}", json=body, headers={**headers, "If-Match": tag})
+
+    assert send(todo_id, auth, etag(todo_id, version + 5)).status_code == 412
+    assert send(todo_id + 10_000, auth, etag(todo_id + 10_000, 1)).status_code == 404
+    assert send(todo_id, other_auth, etag(todo_id, version)).status_code == 404   # not the owner
+    assert collection_version(client, auth) == version   # rejected writes cost no version
+    assert send(todo_id, auth, etag(todo_id, version)).status_code == 200
+
+
+def test_delete_leaves_a_tombstone(client, auth, other_auth):
+    [todo_id] = create_todos(client, auth, 1)
+    assert client.delete(f"/todos/{todo_id}", headers=other_auth).status_code == 404
+
+    assert client.delete(f"/todos/{todo_id}", headers=auth).status_code == 200
+    assert client.get(f"/todos/{todo_id}", headers=auth).status_code == 404
+    assert client.delete(f"/todos/{todo_id}", headers=auth).status_code == 404
+    _, changed, deleted, _ = sync(client, auth)
+    assert todo_id in deleted and todo_id not in changed
+
+
+def test_conditional_get_returns_304_until_the_todo_changes(client, auth):
+    [todo_id] = create_todos(client, auth, 1)
+    tag = client.get(f"/todos/{todo_id}", headers=auth).headers["etag"]
+    assert client.get(f"/todos/{todo_id}", headers={**auth, "If-None-Match": tag}).status_code == 304
+
+    client.put(f"/todos/{todo_id}", json={"completed": True}, headers=auth)
+    response = client.get(f"/todos/{todo_id}", headers={**auth, "If-None-Match": tag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != tag